@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
-from news_fetcher import NewsAPI, HackerNewsFetcher, RSSFetcher, ArticleDeduplicator, AISummaryGenerator, ArticleImageExtractor
+from news_fetcher import SourceRegistry, RSS_FEEDS, ArticleDeduplicator, IncrementalDeduplicator, AISummaryGenerator, ArticleImageExtractor
+from keyword_matcher import get_matcher
+from summary_prefetch import SummaryPrefetcher
 from datetime import datetime
 import time
 
@@ -108,14 +110,30 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_source_registry():
+    """Fetchers shared by every session, constructed only when their source is selected"""
+    return SourceRegistry()
+
+@st.cache_resource
+def get_summarizer():
+    """Summary client shared by every session, constructed on the first summary request"""
+    return AISummaryGenerator()
+
+@st.cache_resource
+def get_prefetcher():
+    """Background summary workers shared by every session, so the rate limit is global"""
+    return SummaryPrefetcher(get_summarizer())
+
+source_registry = get_source_registry()
+
 st.title("🤖 AI News Scraper")
 st.markdown("*Stay updated with the latest AI developments from multiple sources*")
 
-# Initialize session state for articles and summaries
+# Initialize session state for articles
+# Summaries live in the shared summary cache; errors and fallbacks are shown once and never kept
 if 'articles' not in st.session_state:
     st.session_state.articles = []
-if 'summaries' not in st.session_state:
-    st.session_state.summaries = {}
 
 # Sidebar filters
 st.sidebar.header("🔧 Filters")
@@ -129,7 +147,7 @@ news_type = st.sidebar.selectbox(
 
 news_sources = st.sidebar.multiselect(
     "Select Sources:",
-    ["NewsAPI", "Hacker News", "Google News", "TechCrunch", "Ars Technica"],
+    source_registry.source_names,
     default=["NewsAPI", "Hacker News"],
     help="Multiple sources will be combined and deduplicated"
 )
@@ -141,9 +159,16 @@ num_articles = st.sidebar.slider("Articles per Source:", 5, 20, 10)
 st.sidebar.header("🧠 AI Summary Settings")
 ai_provider = st.sidebar.selectbox(
     "Summary Provider:",
-    ["None", "OpenAI (GPT-3.5)", "Google (Gemini)"],
-    help="Requires API keys in .env file"
+    ["None", "OpenAI (GPT-3.5)", "Google (Gemini)", "Auto (fastest)", "Local (extractive)"],
+    help="OpenAI/Gemini require API keys in .env file. Auto races both when a response is slow; Local works offline"
 )
+# Sidebar label -> AISummaryGenerator provider name
+SUMMARY_PROVIDERS = {
+    "OpenAI (GPT-3.5)": "openai",
+    "Google (Gemini)": "gemini",
+    "Auto (fastest)": "auto",
+    "Local (extractive)": "local"
+}
 
 adhd_friendly = st.sidebar.checkbox(
     "🎯 ADHD-Friendly Summaries",
@@ -151,6 +176,12 @@ adhd_friendly = st.sidebar.checkbox(
     help="Bullet points, key insights first, easy to scan"
 )
 
+prefetch_summaries = st.sidebar.checkbox(
+    "⚡ Prefetch Summaries",
+    value=False,
+    help="Summarize the top articles in the background after each refresh (rate limited)"
+)
+
 # Filter keywords to exclude
 exclude_keywords = st.sidebar.text_area(
     "Exclude Keywords (comma-separated):",
@@ -167,74 +198,68 @@ similarity_threshold = st.sidebar.slider(
 
 if st.sidebar.button("🔄 Refresh News", type="primary"):
     with st.spinner("Fetching latest AI news from multiple sources..."):
-        # Initialize fetchers
-        news_api = NewsAPI()
-        hn_fetcher = HackerNewsFetcher()
-        rss_fetcher = RSSFetcher()
-        ai_summarizer = AISummaryGenerator()
-        
         all_articles = []
+        exclude_list = [kw.strip().lower() for kw in exclude_keywords.split(',') if kw.strip()]
         
         # Fetch from NewsAPI if selected
         if "NewsAPI" in news_sources:
             with st.spinner("Fetching from NewsAPI..."):
+                news_api = source_registry.get("NewsAPI")
                 if news_type == "Top Headlines":
                     news_data = news_api.get_top_ai_headlines(page_size=num_articles)
+                    
+                    if news_data and news_data.get('status') == 'ok' and 'articles' in news_data:
+                        for article in news_data['articles']:
+                            all_articles.append(news_api.normalize_article(article))
                 else:
-                    news_data = news_api.get_ai_news(query=search_query, page_size=num_articles)
-                
-                if news_data and news_data.get('status') == 'ok' and 'articles' in news_data:
-                    for article in news_data['articles']:
-                        all_articles.append({
-                            'title': article['title'],
-                            'url': article['url'],
-                            'source': article['source']['name'],
-                            'published': article['publishedAt'],
-                            'description': article.get('description', ''),
-                            'content': article.get('content', ''),
-                            'score': 0  # NewsAPI doesn't have scores
-                        })
+                    # Page through results only until enough unique, non-excluded articles are in hand
+                    all_articles.extend(ArticleDeduplicator.take_unique(
+                        news_api.iter_ai_news(query=search_query, page_size=num_articles),
+                        num_articles,
+                        similarity_threshold,
+                        get_matcher(exclude_list)
+                    ))
         
         # Fetch from Hacker News if selected
         if "Hacker News" in news_sources:
             with st.spinner("Fetching from Hacker News..."):
-                hn_stories = hn_fetcher.get_ai_stories(limit=num_articles)
+                hn_stories = source_registry.get("Hacker News").crawl_ai_stories(limit=num_articles)
                 all_articles.extend(hn_stories)
         
-        # Fetch from RSS if selected
-        if any(source in news_sources for source in ["Google News", "TechCrunch", "Ars Technica"]):
+        # Fetch only the selected RSS feeds
+        if any(source in RSS_FEEDS for source in news_sources):
             with st.spinner("Fetching from RSS feeds..."):
-                rss_articles = rss_fetcher.fetch_rss_news()
+                rss_articles = source_registry.fetch_rss(news_sources)
                 all_articles.extend(rss_articles)
         
         # Filter out excluded keywords
-        if exclude_keywords:
-            exclude_list = [kw.strip().lower() for kw in exclude_keywords.split(',') if kw.strip()]
-            if exclude_list:
-                original_count = len(all_articles)
-                filtered_articles = []
-                for article in all_articles:
-                    title_lower = article['title'].lower()
-                    desc_lower = article.get('description', '').lower()
-                    
-                    if not any(kw in title_lower or kw in desc_lower for kw in exclude_list):
-                        filtered_articles.append(article)
-                
-                all_articles = filtered_articles
-                if original_count > len(all_articles):
-                    st.info(f"Filtered out {original_count - len(all_articles)} articles with excluded keywords")
+        if exclude_list:
+            original_count = len(all_articles)
+            # One compiled whole-word pattern, one pass over title + description per article
+            exclude_matcher = get_matcher(exclude_list)
+            all_articles = [
+                article for article in all_articles
+                if not exclude_matcher.matches(article['title'], article.get('description'))
+            ]
+            if original_count > len(all_articles):
+                st.info(f"Filtered out {original_count - len(all_articles)} articles with excluded keywords")
         
-        # Remove duplicates
-        if len(all_articles) > 1:
-            with st.spinner("Removing duplicates..."):
-                all_articles = ArticleDeduplicator.remove_duplicates(all_articles, similarity_threshold)
+        # Remove duplicates, reusing verdicts for articles already seen on the previous refresh
+        deduplicator = st.session_state.get('deduplicator')
+        if deduplicator is None or deduplicator.similarity_threshold != similarity_threshold:
+            deduplicator = st.session_state.deduplicator = IncrementalDeduplicator(similarity_threshold)
+        with st.spinner("Removing duplicates..."):
+            all_articles = deduplicator.update(all_articles)
         
         # Sort by publication date (newest first) and score
         all_articles.sort(key=lambda x: (x.get('score', 0), x.get('published', '')), reverse=True)
         
+        # Resolve every card image up front, concurrently, so rendering never waits on a page download
+        with st.spinner("Loading article images..."):
+            ArticleImageExtractor.resolve_images(all_articles)
+        
         # Store in session state
         st.session_state.articles = all_articles
-        st.session_state.summaries = {}  # Clear old summaries
         
         st.success(f"✅ Found {len(all_articles)} unique articles from {len(news_sources)} sources!")
 
@@ -242,6 +267,13 @@ if st.sidebar.button("🔄 Refresh News", type="primary"):
 if st.session_state.articles:
     st.header(f"📰 Latest AI News ({len(st.session_state.articles)} articles)")
     
+    # Queue background summaries; cached and already-queued articles are skipped
+    if prefetch_summaries and SUMMARY_PROVIDERS.get(ai_provider) not in (None, 'local'):
+        # Remember what this session queued; the rerun loop below only waits on those
+        st.session_state.prefetch_keys = st.session_state.get('prefetch_keys', set()) | set(
+            get_prefetcher().prefetch(st.session_state.articles, SUMMARY_PROVIDERS[ai_provider], adhd_friendly)
+        )
+    
     # Add stats
     col1, col2, col3, col4 = st.columns(4)
     sources = [article.get('source', 'Unknown') for article in st.session_state.articles]
@@ -272,19 +304,12 @@ if st.session_state.articles:
                 # Create individual compact card container with image
                 with st.container():
                     
-                    # Get article image
-                    if 'image_url' not in article:
-                        # Try to extract real image first, fallback to placeholder
-                        try:
-                            article['image_url'] = ArticleImageExtractor.get_article_image(
-                                article['url'], 
-                                article['title']
-                            )
-                        except:
-                            article['image_url'] = ArticleImageExtractor.get_source_specific_image(
-                                article.get('source', 'Unknown'),
-                                article['title']
-                            )
+                    # Images are resolved right after refresh; this only covers articles that missed it
+                    if not article.get('image_url'):
+                        article['image_url'] = ArticleImageExtractor.get_source_specific_image(
+                            article.get('source', 'Unknown'),
+                            article['title']
+                        )
                     
                     # Display compact card image
                     try:
@@ -335,28 +360,34 @@ if st.session_state.articles:
                     
                     # AI Summary section (compact)
                     if ai_provider != "None":
-                        summary_key = f"summary_{i}_{idx}"
+                        title = article['title']
+                        description = article.get('description', '')
+                        content = article.get('content', '')
+                        provider = SUMMARY_PROVIDERS.get(ai_provider)
+                        # Keyed by article content + settings, so it survives refreshes and re-sorting
+                        summary_key = get_summarizer().summary_key(title, description, content, provider, adhd_friendly)
+                        if provider == 'local':
+                            # Milliseconds and offline, so every card gets one straight away
+                            summary = get_summarizer().summarize_locally(title, description, content, adhd_friendly)
+                        else:
+                            summary = get_summarizer().get_cached_summary(title, description, content, provider, adhd_friendly)
                         
-                        if summary_key in st.session_state.summaries:
+                        if summary is not None:
                             st.success("🧠")
                             with st.expander("Summary", expanded=False):
-                                st.markdown(st.session_state.summaries[summary_key])
+                                st.markdown(summary)
+                        elif prefetch_summaries and get_prefetcher().is_pending(summary_key):
+                            st.caption("⏳ Summarizing...")
                         else:
                             if st.button(f"🤖", key=f"summarize_{i}_{idx}", use_container_width=True, help="AI Summary"):
-                                with st.spinner("🧠"):
-                                    title = article['title']
-                                    description = article.get('description', '')
-                                    content = article.get('content', '')
-                                    
-                                    if ai_provider == "OpenAI (GPT-3.5)":
-                                        summary = ai_summarizer.summarize_with_openai(title, description, content, adhd_friendly)
-                                    elif ai_provider == "Google (Gemini)":
-                                        summary = ai_summarizer.summarize_with_gemini(title, description, content, adhd_friendly)
-                                    else:
-                                        summary = "AI summary not available"
-                                    
-                                    st.session_state.summaries[summary_key] = summary
-                                    st.rerun()
+                                # Rendered as the chunks arrive; the finished text lands in the summary cache
+                                with st.expander("Summary", expanded=True):
+                                    summary = st.write_stream(
+                                        get_summarizer().stream_summary(title, description, content, provider, adhd_friendly)
+                                    )
+                                # Errors, partial streams and local fallbacks aren't cached, so the button stays for a retry
+                                if get_summarizer().get_cached_summary(title, description, content, provider, adhd_friendly) is None:
+                                    st.caption("Not saved; click 🤖 to try again")
                 
                 # Add visual separation between cards
                 st.markdown("---")
@@ -469,3 +500,13 @@ with col2:
     st.markdown("*Powered by NewsAPI & Hacker News*")
 with col3:
     st.markdown("*AI Summaries via OpenAI/Gemini*")
+
+# Re-render while summaries this session queued are still arriving, so cards pick them up as they land.
+# Failed keys back off in the prefetcher instead of being requeued, so this stops once they settle.
+if prefetch_summaries and st.session_state.articles:
+    st.session_state.prefetch_keys = {
+        key for key in st.session_state.get('prefetch_keys', set()) if get_prefetcher().is_pending(key)
+    }
+    if st.session_state.prefetch_keys:
+        time.sleep(2)
+        st.rerun()
@@ -0,0 +1,64 @@
+"""
+URL and title canonicalization, so trivially different copies of a story compare equal
+(tracking parameters, http vs https, www/AMP variants, Google News " - Publisher" suffixes)
+"""
+
+import re
+import unicodedata
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+# Query parameters that only identify the click, never the content
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    'ref', 'ref_src', 'ref_url', 'cmpid', 'ocid', 'smid', 'taid', 'spm',
+    'guccounter', 'guce_referrer', 'guce_referrer_sig', '_hsenc', '_hsmi', 'mkt_tok',
+    'amp', 'outputtype'
+}
+HOST_PREFIXES = ('www.', 'm.', 'amp.')
+PUBLISHER_SUFFIX = re.compile(r'\s+[-–—|]\s+([^-–—|]+)$')
+
+
+def canonical_url(url):
+    """Scheme-less, lowercase-host url with tracking parameters, fragments and AMP markers removed"""
+    url = (url or '').strip()
+    if not url:
+        return ''
+    parts = urlsplit(url if '://' in url else 'https://' + url)
+
+    host = parts.hostname or ''
+    # Google AMP cache: <mangled>.cdn.ampproject.org/c/s/<host>/<path>
+    if host.endswith('.cdn.ampproject.org'):
+        match = re.match(r'^/[a-z]/(?:s/)?(.+)$', parts.path)
+        if match:
+            return canonical_url('https://' + match.group(1) + ('?' + parts.query if parts.query else ''))
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+
+    path = re.sub(r'/{2,}', '/', parts.path)
+    path = re.sub(r'\.amp\.html$', '.html', path)
+    path = re.sub(r'^/amp(?=/)', '', path)
+    path = re.sub(r'/amp/?$', '', path)
+    path = path.rstrip('/')
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    return host + path + ('?' + urlencode(query) if query else '')
+
+
+def canonical_title(title, source=None):
+    """Lowercase, punctuation-free title; the trailing ' - Publisher' is dropped when it names the source"""
+    title = unicodedata.normalize('NFKC', title or '').strip()
+
+    match = PUBLISHER_SUFFIX.search(title)
+    if match and source:
+        suffix = match.group(1).strip().lower()
+        source = source.lower()
+        # Google News always appends the publisher; elsewhere only strip it when it is the article's own source
+        if 'google news' in source or suffix == source:
+            title = title[:match.start()]
+
+    return ' '.join(re.sub(r'[^\w\s]', ' ', title.lower()).split())
@@ -2,8 +2,9 @@ import schedule
 import time
 import os
 from datetime import datetime
-from news_fetcher import NewsAPI, HackerNewsFetcher, ArticleDeduplicator
+from news_fetcher import NewsAPI, HackerNewsFetcher, ArticleDeduplicator, ArticleImageExtractor
 from slack_notifier import SlackNotifier
+from news_cache import SeenArticleStore
 
 class DailyNewsScheduler:
     """Handles scheduled daily news scraping and Slack notifications"""
@@ -13,6 +14,8 @@ class DailyNewsScheduler:
         self.hn_fetcher = HackerNewsFetcher()
         self.deduplicator = ArticleDeduplicator()
         self.slack = SlackNotifier()
+        # Stories already sent in an earlier digest are dropped before dedup
+        self.seen_store = SeenArticleStore()
     
     def fetch_daily_news(self) -> tuple:
         """Fetch and deduplicate daily news"""
@@ -24,7 +27,7 @@ class DailyNewsScheduler:
         # Fetch Hacker News
         try:
             print("📰 Fetching Hacker News...")
-            hn_articles = self.hn_fetcher.get_top_stories(limit=10)
+            hn_articles = self.hn_fetcher.crawl_ai_stories(limit=10)
             if hn_articles:
                 all_articles.extend(hn_articles)
                 stats['hacker_news_count'] = len(hn_articles)
@@ -35,19 +38,11 @@ class DailyNewsScheduler:
         # Fetch from NewsAPI
         try:
             print("🌐 Fetching NewsAPI...")
-            news_response = self.news_api.get_ai_news(query="artificial intelligence", page_size=15)
-            if news_response and news_response.get('status') == 'ok':
-                news_articles = []
-                for article in news_response['articles']:
-                    news_articles.append({
-                        'title': article['title'],
-                        'description': article['description'],
-                        'url': article['url'],
-                        'published': article['publishedAt'],
-                        'source': article['source']['name'],
-                        'content': article.get('content', ''),
-                        'image_url': article.get('urlToImage')
-                    })
+            # Page lazily until 15 unique articles are collected
+            news_articles = ArticleDeduplicator.take_unique(
+                self.news_api.iter_ai_news(query="artificial intelligence", page_size=15), 15
+            )
+            if news_articles:
                 all_articles.extend(news_articles)
                 stats['news_api_count'] = len(news_articles)
                 print(f"✅ Got {len(news_articles)} NewsAPI articles")
@@ -57,7 +52,7 @@ class DailyNewsScheduler:
         # Deduplicate articles
         if all_articles:
             print("🔍 Deduplicating articles...")
-            deduplicated = self.deduplicator.deduplicate_articles(all_articles)
+            deduplicated = self.deduplicator.remove_duplicates(all_articles, 80, seen_store=self.seen_store)
             print(f"📊 Deduplicated {len(all_articles)} -> {len(deduplicated)} articles")
             return deduplicated, stats
         
@@ -72,10 +67,15 @@ class DailyNewsScheduler:
                 print("⚠️ No articles found for daily update")
                 return
             
+            # Real images only (cached on disk across runs); Slack cards without one just skip the image
+            ArticleImageExtractor.resolve_images(articles[:10], placeholders=False)
+            
             print(f"📤 Sending {len(articles)} articles to Slack...")
             success = self.slack.send_daily_news(articles, stats)
             
             if success:
+                # Slack only shows the first 10
+                self.seen_store.mark_delivered(articles[:10])
                 print("✅ Daily news update sent successfully!")
             else:
                 print("❌ Failed to send daily news update")
@@ -0,0 +1,142 @@
+"""
+Candidate blocking for title deduplication
+MinHash signatures over character shingles, bucketed with LSH bands, so each new title is only
+compared (with the exact fuzz.ratio check) against titles that share at least one band
+"""
+
+import zlib
+import numpy as np
+from fuzzywuzzy import fuzz
+
+# Mersenne prime 2^31 - 1: a * h + b stays below 2^63 for 31-bit a, b and 32-bit crc32 h
+_PRIME = np.uint64((1 << 31) - 1)
+
+
+def normalize_title(title):
+    """Lowercase and collapse whitespace once, so comparisons don't re-allocate per pair"""
+    return ' '.join((title or '').lower().split())
+
+
+class TitleIndex:
+    """MinHash/LSH index mapping keys to normalized titles"""
+
+    def __init__(self, bands=20, rows=3, shingle_size=3, seed=42):
+        rng = np.random.default_rng(seed)
+        self.bands = bands
+        self.rows = rows
+        self.shingle_size = shingle_size
+        self._a = rng.integers(1, int(_PRIME), size=bands * rows, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), size=bands * rows, dtype=np.uint64)
+        self._buckets = [{} for _ in range(bands)]
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def title(self, key):
+        return self._entries[key][0]
+
+    def keys(self):
+        return list(self._entries)
+
+    def _band_keys(self, title):
+        """MinHash the title's shingles and cut the signature into per-band bucket keys"""
+        k = self.shingle_size
+        shingles = {title[i:i + k] for i in range(max(len(title) - k + 1, 1))}
+        hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+        signature = ((np.outer(hashes, self._a) + self._b) % _PRIME).min(axis=0)
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def candidates(self, title):
+        """Keys of indexed titles sharing at least one LSH band with the (normalized) title"""
+        found = set()
+        for band, band_key in zip(self._buckets, self._band_keys(title)):
+            found.update(band.get(band_key, ()))
+        return found
+
+    def add(self, key, title):
+        """Index a normalized title under key"""
+        band_keys = self._band_keys(title)
+        for band, band_key in zip(self._buckets, band_keys):
+            band.setdefault(band_key, []).append(key)
+        self._entries[key] = (title, band_keys)
+
+    def remove(self, key):
+        """Drop a key from the index"""
+        title, band_keys = self._entries.pop(key)
+        for band, band_key in zip(self._buckets, band_keys):
+            bucket = band[band_key]
+            bucket.remove(key)
+            if not bucket:
+                del band[band_key]
+
+
+class UnionFind:
+    """Disjoint sets over 0..n-1 with path halving and union by size"""
+
+    def __init__(self, n):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i, j):
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i == root_j:
+            return
+        if self.size[root_i] < self.size[root_j]:
+            root_i, root_j = root_j, root_i
+        self.parent[root_j] = root_i
+        self.size[root_i] += self.size[root_j]
+
+    def groups(self):
+        """Members of each set, ordered by their smallest member"""
+        groups = {}
+        for i in range(len(self.parent)):
+            groups.setdefault(self.find(i), []).append(i)
+        return sorted(groups.values(), key=lambda members: members[0])
+
+
+def title_lengths(titles):
+    return np.array([len(title) for title in titles], dtype=np.float64)
+
+
+def similar_pairs(titles, lengths, start, stop, threshold):
+    """All (i, j) with start <= i < stop, j > i and fuzz.ratio above threshold
+
+    ratio can't exceed 200 * min(len) / (len_i + len_j), so a vectorized length bound over the
+    whole row discards most pairs before the exact check.
+    """
+    pairs = []
+    for i in range(start, stop):
+        rest = lengths[i + 1:]
+        bound = 200 * np.minimum(rest, lengths[i]) / np.maximum(rest + lengths[i], 1)
+        for offset in np.nonzero(bound > threshold)[0]:
+            j = i + 1 + int(offset)
+            if fuzz.ratio(titles[i], titles[j]) > threshold:
+                pairs.append((i, j))
+    return pairs
+
+
+# Set once per worker process by the pool initializer, so titles aren't re-pickled for every chunk.
+# Only pool workers touch these; in-process callers use similar_pairs directly.
+_worker_titles = None
+_worker_lengths = None
+
+
+def init_pair_worker(titles):
+    global _worker_titles, _worker_lengths
+    _worker_titles = titles
+    _worker_lengths = title_lengths(titles)
+
+
+def similar_pairs_chunk(start, stop, threshold):
+    """similar_pairs over the titles installed by init_pair_worker (pool worker entry point)"""
+    return similar_pairs(_worker_titles, _worker_lengths, start, stop, threshold)
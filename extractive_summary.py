@@ -0,0 +1,135 @@
+"""
+Offline extractive summaries
+Sentences from the description and content are ranked by TF-IDF weight, overlap with the title
+and position, and the best 2-3 are returned in their original order. No network, a few
+milliseconds per article, so it works without API keys and as a fallback when a provider fails.
+"""
+
+import re
+import math
+from collections import Counter
+from prompt_compaction import clean_text, word_set, is_repeat, SENTENCE_SPLIT
+
+WORD = re.compile(r"[a-z0-9][a-z0-9'\-]*")
+
+# Picks sharing this much vocabulary with an earlier pick say the same thing twice
+NEAR_DUPLICATE = 0.5
+
+# Wording that marks a sentence as an implication or as what comes next
+IMPACT_CUES = {
+    'because', 'means', 'meaning', 'could', 'impact', 'allows', 'enables', 'lets', 'helps',
+    'cuts', 'reduces', 'improves', 'faster', 'cheaper', 'risk', 'risks', 'concerns', 'important',
+    'significant', 'first', 'beats', 'outperforms', 'rivals', 'competition', 'developers', 'users'
+}
+OUTLOOK_CUES = {
+    'will', 'plans', 'planned', 'expected', 'expects', 'expect', 'available', 'launch', 'launches',
+    'rollout', 'rolling', 'next', 'later', 'soon', 'pricing', 'costs', 'starts', 'coming', 'upcoming',
+    'release', 'waitlist', 'beta', 'preview'
+}
+
+STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'but', 'if', 'of', 'to', 'in', 'on', 'for', 'with', 'at', 'by',
+    'from', 'as', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'it', 'its', 'this', 'that',
+    'these', 'those', 'has', 'have', 'had', 'will', 'would', 'can', 'could', 'should', 'may',
+    'might', 'not', 'no', 'so', 'than', 'then', 'there', 'their', 'they', 'them', 'he', 'she',
+    'his', 'her', 'we', 'our', 'you', 'your', 'i', 'about', 'into', 'over', 'after', 'also',
+    'more', 'most', 'just', 'said', 'says', 'new', 'which', 'who', 'what', 'when', 'how', 'up'
+}
+
+
+def _words(text):
+    return [word for word in WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+def split_sentences(text):
+    """Plain-text sentences (at least four words) after the same cleanup the LLM prompts get"""
+    return [sentence.strip() for sentence in SENTENCE_SPLIT.split(clean_text(text)) if len(sentence.split()) >= 4]
+
+
+def _similarity(a, b):
+    """Jaccard overlap of two content-word sets"""
+    return len(a & b) / max(len(a | b), 1)
+
+
+def rank_sentences(title, description, content):
+    """Sentences of description + content, best first
+
+    Like the prompt compaction, sentences that only repeat the title (or, for content, the
+    description) are dropped before ranking, so the summary adds something beyond the headline.
+    """
+    title_words = word_set(title)
+    description_sentences = [s for s in split_sentences(description) if not is_repeat(s, title_words)]
+    seen_words = title_words | word_set(' '.join(description_sentences))
+    content_sentences = [s for s in split_sentences(content) if not is_repeat(s, seen_words)]
+
+    sentences = []
+    seen = set()
+    for sentence in description_sentences + content_sentences:
+        key = ' '.join(_words(sentence))
+        if key and key not in seen:
+            seen.add(key)
+            sentences.append(sentence)
+    if not sentences:
+        return []
+
+    tokenized = [_words(sentence) for sentence in sentences]
+    document_frequency = Counter(word for words in tokenized for word in set(words))
+    title_terms = set(_words(title))
+    n = len(sentences)
+
+    scored = []
+    for position, (sentence, words) in enumerate(zip(sentences, tokenized)):
+        if not words:
+            continue
+        counts = Counter(words)
+        tfidf = sum(count * math.log(1 + n / document_frequency[word]) for word, count in counts.items())
+        # Length-normalized so long sentences don't win on size alone
+        score = tfidf / math.sqrt(len(words))
+        score *= 1 + len(title_terms & counts.keys()) / max(len(title_terms), 1)
+        # News leads carry the story
+        score *= 1 + 0.5 / (1 + position)
+        scored.append((score, position, sentence))
+
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [(position, sentence) for _, position, sentence in scored]
+
+
+def _pick_distinct(ranked, limit, threshold=NEAR_DUPLICATE):
+    """Best-ranked sentences, skipping any too similar to one already picked"""
+    picked = []
+    for position, sentence in ranked:
+        words = set(_words(sentence))
+        if all(_similarity(words, set(_words(other))) < threshold for _, other in picked):
+            picked.append((position, sentence))
+            if len(picked) == limit:
+                break
+    return picked
+
+
+def _has_cue(sentence, cues):
+    return bool(set(WORD.findall(sentence.lower())) & cues)
+
+
+def extractive_summary(title, description='', content='', adhd_friendly=False, max_sentences=3):
+    """2-3 sentence summary, or the ADHD bullet format, built from the article's own sentences"""
+    ranked = rank_sentences(title, description, content)
+    if not ranked:
+        return title
+    # Short articles get two sentences; never more than the text has
+    count = max_sentences if len(ranked) > 4 else 2
+    chosen = _pick_distinct(ranked, count)
+
+    if not adhd_friendly:
+        return ' '.join(sentence for _, sentence in sorted(chosen))
+
+    # Key insight is the best-ranked sentence; the other labels go to the sentences whose wording
+    # fits them (implications vs. what happens next), so a label never sits on an unrelated fact
+    key_insight = chosen[0][1]
+    rest = [sentence for _, sentence in _pick_distinct(ranked, len(ranked)) if sentence != key_insight]
+    bullets = [('Key Insight', key_insight)]
+    for label, cues in (('Why It Matters', IMPACT_CUES), ('Bottom Line', OUTLOOK_CUES)):
+        match = next((sentence for sentence in rest if _has_cue(sentence, cues)), None)
+        if match is not None:
+            bullets.append((label, match))
+            rest.remove(match)
+    return '\n'.join(f"• **{label}:** {sentence}" for label, sentence in bullets)
@@ -0,0 +1,91 @@
+"""
+Streaming RSS/Atom parsing: entries are normalized and yielded as the document is read,
+so callers can stop after N entries (or at the first already-seen GUID) without downloading
+or parsing the rest of the feed
+"""
+
+import xml.etree.ElementTree as ET
+
+ENTRY_TAGS = ('item', 'entry')
+FEED_TAGS = ('channel', 'feed')
+
+
+def _local_name(tag):
+    """Strip the namespace from an ElementTree tag ('{ns}title' -> 'title')"""
+    return tag.rsplit('}', 1)[-1].lower()
+
+
+def _text(elem):
+    """Text content of an element, including any inline (xhtml) children"""
+    return ''.join(elem.itertext()).strip()
+
+
+def _entry_to_article(elem, feed_title):
+    """Normalize an RSS <item> or Atom <entry> into the common article format"""
+    fields = {}
+    link = None
+    for child in elem:
+        name = _local_name(child.tag)
+        if name == 'link':
+            # RSS puts the url in the text, Atom in href (prefer rel="alternate")
+            href = child.get('href')
+            if href is None:
+                link = link or _text(child)
+            elif child.get('rel', 'alternate') == 'alternate':
+                link = href
+            else:
+                link = link or href
+        elif name not in fields:
+            fields[name] = _text(child)
+
+    title = fields.get('title')
+    if not title:
+        return None
+    return {
+        'title': title,
+        'url': link or fields.get('guid', ''),
+        'published': fields.get('pubdate') or fields.get('published') or fields.get('updated') or fields.get('date') or 'Unknown',
+        'source': feed_title or 'RSS',
+        'description': fields.get('description') or fields.get('summary') or fields.get('content') or '',
+        'guid': fields.get('guid') or fields.get('id') or link
+    }
+
+
+def iter_feed_entries(chunks, max_entries=10, stop_guids=()):
+    """Yield normalized articles from an iterable of byte chunks
+
+    Stops after max_entries articles or just before the first entry whose GUID is in stop_guids.
+    Raises xml.etree.ElementTree.ParseError on malformed documents.
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    stack = []
+    feed_title = None
+    count = 0
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == 'start':
+                stack.append(elem)
+                continue
+
+            stack.pop()
+            name = _local_name(elem.tag)
+            parent = _local_name(stack[-1].tag) if stack else None
+
+            if name == 'title' and parent in FEED_TAGS and feed_title is None:
+                feed_title = _text(elem)
+            elif name in ENTRY_TAGS:
+                article = _entry_to_article(elem, feed_title)
+                # Entries are dropped once read, so memory stays flat however long the feed is
+                elem.clear()
+                if stack:
+                    stack[-1].remove(elem)
+                if article is None:
+                    continue
+                if article['guid'] in stop_guids:
+                    return
+                yield article
+                count += 1
+                if count >= max_entries:
+                    return
@@ -0,0 +1,69 @@
+"""
+Precompiled keyword matching shared by the Hacker News relevance filter and the exclusion filter
+Keywords match whole words only (so 'ai' no longer matches 'email' or 'said'), with an optional plural 's'
+"""
+
+import re
+from functools import lru_cache
+
+
+def _normalize_keyword(keyword):
+    """Lowercase and collapse internal whitespace"""
+    return ' '.join(keyword.lower().split())
+
+
+def _trie_pattern(node):
+    """Turn a character trie into a regex so shared prefixes are only tried once per position"""
+    alternatives = []
+    is_end = False
+    for char in sorted(node):
+        if char == '':
+            is_end = True
+            continue
+        token = r'\s+' if char == ' ' else re.escape(char)
+        alternatives.append(token + _trie_pattern(node[char]))
+
+    if not alternatives:
+        return ''
+    pattern = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+    # A keyword ending here may also continue into a longer one; prefer the longer match
+    return f'(?:{pattern})?' if is_end else pattern
+
+
+class KeywordMatcher:
+    """Matches a fixed keyword set against text in a single regex pass"""
+
+    def __init__(self, keywords):
+        self.keywords = tuple(sorted({_normalize_keyword(k) for k in keywords if k and k.strip()}))
+        self._regex = None
+
+        if self.keywords:
+            trie = {}
+            for keyword in self.keywords:
+                node = trie
+                for char in keyword:
+                    node = node.setdefault(char, {})
+                node[''] = {}
+            self._regex = re.compile(rf'(?<!\w)({_trie_pattern(trie)})s?(?!\w)', re.IGNORECASE)
+
+    def matches(self, *texts):
+        """Return True if any keyword appears in any of the texts"""
+        if not self._regex:
+            return False
+        return self._regex.search('\n'.join(t for t in texts if t)) is not None
+
+    def find_all(self, *texts):
+        """Return the set of keywords that appear in the texts"""
+        if not self._regex:
+            return set()
+        return {_normalize_keyword(m.group(1)) for m in self._regex.finditer('\n'.join(t for t in texts if t))}
+
+
+@lru_cache(maxsize=64)
+def _cached_matcher(keywords):
+    return KeywordMatcher(keywords)
+
+
+def get_matcher(keywords):
+    """Return a compiled matcher for the keyword set, built once and reused across calls"""
+    return _cached_matcher(tuple(sorted({_normalize_keyword(k) for k in keywords if k and k.strip()})))
@@ -0,0 +1,278 @@
+"""
+LLM provider clients used by AISummaryGenerator
+Each provider holds one long-lived client (pooled keep-alive connections), applies a per-attempt
+timeout and an overall deadline, retries 429/5xx/connection errors with jittered exponential
+backoff, and can be throttled with a token bucket. Models and endpoints come from the environment,
+so both providers can be pointed at a local stub server (OPENAI_BASE_URL / GEMINI_API_ENDPOINT).
+"""
+
+import os
+import time
+import random
+import bisect
+import threading
+
+import openai
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+import requests
+
+
+class RequestCancelled(Exception):
+    """Raised when a request is abandoned because a competing (hedged) request already won"""
+
+
+class RateLimiter:
+    """Token bucket that refills at requests_per_minute and allows short bursts up to capacity"""
+
+    def __init__(self, requests_per_minute, capacity=None):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = capacity or max(1, int(requests_per_minute // 10))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be made"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class LatencyHistogram:
+    """Log-spaced latency buckets (50ms to ~100s) with approximate quantiles
+
+    Old observations decay by half every half_life samples, so quantiles follow the provider's
+    current behaviour rather than its all-time average.
+    """
+
+    def __init__(self, min_seconds=0.05, max_seconds=120.0, buckets=40, half_life=200):
+        ratio = (max_seconds / min_seconds) ** (1.0 / (buckets - 1))
+        self.bounds = [min_seconds * ratio ** i for i in range(buckets)]
+        self.counts = [0.0] * (buckets + 1)
+        self.decay = 0.5 ** (1.0 / half_life)
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self.counts = [count * self.decay for count in self.counts]
+            self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+            self.samples += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile, or None before any samples"""
+        with self._lock:
+            total = sum(self.counts)
+            if not total:
+                return None
+            running = 0.0
+            for i, count in enumerate(self.counts):
+                running += count
+                if running >= q * total:
+                    return self.bounds[min(i, len(self.bounds) - 1)]
+        return self.bounds[-1]
+
+
+class LLMProvider:
+    """Shared retry, deadline and rate-limit handling; subclasses implement _generate and _is_retryable"""
+
+    name = ''
+
+    def __init__(self, model, timeout=None, deadline=None, max_retries=None, requests_per_minute=None):
+        self.model = model
+        # Per-attempt timeout, and the overall budget including retries and backoff
+        self.timeout = timeout or float(os.getenv('LLM_TIMEOUT', '20'))
+        self.deadline = deadline or float(os.getenv('LLM_DEADLINE', '60'))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('LLM_MAX_RETRIES', '3'))
+        self.base_backoff = 0.5
+        self.max_backoff = 8.0
+        requests_per_minute = requests_per_minute or float(os.getenv('LLM_RPM', '60'))
+        self.limiter = RateLimiter(requests_per_minute) if requests_per_minute > 0 else None
+        # Wall time of successful generate() calls, retries included
+        self.latency = LatencyHistogram()
+
+    def generate(self, prompt, system_prompt=None, max_tokens=None, temperature=None, json_output=False, cancel=None):
+        """Return the completion text, retrying transient failures until the deadline
+
+        cancel is an optional threading.Event; once set, no further attempts are started.
+        """
+        started = time.monotonic()
+        deadline = started + self.deadline
+        for attempt in range(self.max_retries + 1):
+            if self.limiter:
+                self.limiter.acquire()
+            if cancel is not None and cancel.is_set():
+                raise RequestCancelled(f"{self.name} request cancelled")
+            remaining = deadline - time.monotonic()
+            try:
+                text = self._generate(prompt, system_prompt, max_tokens, temperature, json_output,
+                                      timeout=max(1.0, min(self.timeout, remaining)))
+                self.latency.record(time.monotonic() - started)
+                return text
+            except Exception as e:
+                if attempt == self.max_retries or not self._is_retryable(e) or (cancel is not None and cancel.is_set()):
+                    raise
+                # Full jitter keeps concurrent workers from retrying in lockstep
+                delay = random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+                if time.monotonic() + delay >= deadline:
+                    raise
+                print(f"{self.name} request failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def stream(self, prompt, system_prompt=None, max_tokens=None, temperature=None):
+        """Yield the completion as text chunks
+
+        Transient failures are retried like generate() until the first chunk arrives; after that
+        an error is raised to the caller, since the chunks already yielded can't be taken back.
+        """
+        deadline = time.monotonic() + self.deadline
+        for attempt in range(self.max_retries + 1):
+            if self.limiter:
+                self.limiter.acquire()
+            remaining = deadline - time.monotonic()
+            started = False
+            try:
+                for chunk in self._stream(prompt, system_prompt, max_tokens, temperature,
+                                          timeout=max(1.0, min(self.timeout, remaining))):
+                    if chunk:
+                        started = True
+                        yield chunk
+                return
+            except Exception as e:
+                if started or attempt == self.max_retries or not self._is_retryable(e):
+                    raise
+                delay = random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+                if time.monotonic() + delay >= deadline:
+                    raise
+                print(f"{self.name} stream failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _generate(self, prompt, system_prompt, max_tokens, temperature, json_output, timeout):
+        raise NotImplementedError
+
+    def _stream(self, prompt, system_prompt, max_tokens, temperature, timeout):
+        raise NotImplementedError
+
+    def _is_retryable(self, error):
+        return False
+
+
+class OpenAIProvider(LLMProvider):
+    name = 'OpenAI'
+
+    def __init__(self, api_key, model=None, base_url=None, **kwargs):
+        super().__init__(model or os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo'), **kwargs)
+        # Retries are handled above, so the SDK's own are disabled
+        self.client = openai.OpenAI(
+            api_key=api_key,
+            base_url=base_url or os.getenv('OPENAI_BASE_URL') or None,
+            timeout=self.timeout,
+            max_retries=0
+        )
+
+    def _request_args(self, prompt, system_prompt, max_tokens, temperature):
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+
+        options = {}
+        if max_tokens:
+            options['max_tokens'] = max_tokens
+        if temperature is not None:
+            options['temperature'] = temperature
+        return messages, options
+
+    def _generate(self, prompt, system_prompt, max_tokens, temperature, json_output, timeout):
+        messages, options = self._request_args(prompt, system_prompt, max_tokens, temperature)
+        if json_output:
+            options['response_format'] = {"type": "json_object"}
+
+        response = self.client.chat.completions.create(model=self.model, messages=messages, timeout=timeout, **options)
+        return response.choices[0].message.content
+
+    def _stream(self, prompt, system_prompt, max_tokens, temperature, timeout):
+        messages, options = self._request_args(prompt, system_prompt, max_tokens, temperature)
+        response = self.client.chat.completions.create(
+            model=self.model, messages=messages, timeout=timeout, stream=True, **options
+        )
+        try:
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Releases the connection back to the pool if the consumer stops early
+            response.close()
+
+    def _is_retryable(self, error):
+        if isinstance(error, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError)):
+            return True
+        return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+class GeminiProvider(LLMProvider):
+    name = 'Gemini'
+
+    def __init__(self, api_key, model=None, api_endpoint=None, **kwargs):
+        super().__init__(model or os.getenv('GEMINI_MODEL', 'gemini-1.5-flash'), **kwargs)
+        api_endpoint = api_endpoint or os.getenv('GEMINI_API_ENDPOINT')
+        if api_endpoint:
+            genai.configure(api_key=api_key, transport='rest', client_options={'api_endpoint': api_endpoint})
+        else:
+            genai.configure(api_key=api_key)
+        # GenerativeModel objects are reused per system prompt; the underlying client is process-wide
+        self._models = {}
+        self._models_lock = threading.Lock()
+
+    def _model(self, system_prompt):
+        with self._models_lock:
+            if system_prompt not in self._models:
+                self._models[system_prompt] = genai.GenerativeModel(self.model, system_instruction=system_prompt)
+            return self._models[system_prompt]
+
+    def _config(self, max_tokens, temperature, json_output=False):
+        config = {}
+        if max_tokens:
+            config['max_output_tokens'] = max_tokens
+        if temperature is not None:
+            config['temperature'] = temperature
+        if json_output:
+            config['response_mime_type'] = 'application/json'
+        return config or None
+
+    def _generate(self, prompt, system_prompt, max_tokens, temperature, json_output, timeout):
+        response = self._model(system_prompt).generate_content(
+            prompt,
+            generation_config=self._config(max_tokens, temperature, json_output),
+            request_options={'timeout': timeout}
+        )
+        return response.text
+
+    def _stream(self, prompt, system_prompt, max_tokens, temperature, timeout):
+        response = self._model(system_prompt).generate_content(
+            prompt,
+            generation_config=self._config(max_tokens, temperature),
+            request_options={'timeout': timeout},
+            stream=True
+        )
+        for chunk in response:
+            if chunk.parts:
+                yield chunk.text
+
+    def _is_retryable(self, error):
+        return isinstance(error, (
+            google_exceptions.ResourceExhausted,
+            google_exceptions.ServiceUnavailable,
+            google_exceptions.InternalServerError,
+            google_exceptions.DeadlineExceeded,
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout
+        ))
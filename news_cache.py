@@ -0,0 +1,383 @@
+"""
+Local SQLite stores shared by the Streamlit app and both schedulers
+Everything lives in one database file under NEWS_CACHE_DIR (default: .cache/)
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from contextlib import contextmanager
+from canonicalize import canonical_url, canonical_title
+
+CACHE_DIR = os.getenv('NEWS_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache'))
+CACHE_DB = 'news_cache.sqlite3'
+
+
+class SQLiteStore:
+    """Base class that owns the database file and creates the store's tables"""
+
+    schema = ""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(CACHE_DIR, CACHE_DB)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # sqlite handles cross-process locking; this serializes writers inside one process
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.schema)
+
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection so the store can be used from any thread"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+
+class HNItemCache(SQLiteStore):
+    """Hacker News items keyed by story id, with separate timestamps for the full item and its score"""
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS hn_items (
+            id INTEGER PRIMARY KEY,
+            item TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            score_checked_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path=None, item_ttl=None, score_ttl=None):
+        super().__init__(path)
+        # Titles, urls and text rarely change after posting, scores move constantly
+        self.item_ttl = item_ttl if item_ttl is not None else float(os.getenv('HN_ITEM_TTL', str(24 * 3600)))
+        self.score_ttl = score_ttl if score_ttl is not None else float(os.getenv('HN_SCORE_TTL', str(15 * 60)))
+
+    def get(self, story_id):
+        """Return (item, needs_full_fetch, needs_score_refresh) for a cached story, or None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT item, fetched_at, score_checked_at FROM hn_items WHERE id = ?", (story_id,)
+            ).fetchone()
+        if not row:
+            return None
+
+        now = time.time()
+        item = json.loads(row[0])
+        return item, now - row[1] > self.item_ttl, now - row[2] > self.score_ttl
+
+    def put(self, story_id, item):
+        """Store a freshly fetched item"""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO hn_items (id, item, fetched_at, score_checked_at) VALUES (?, ?, ?, ?)",
+                (story_id, json.dumps(item), now, now)
+            )
+
+    def update_score(self, story_id, item, score):
+        """Record a score-only refresh without resetting the full item's age"""
+        item['score'] = score
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE hn_items SET item = ?, score_checked_at = ? WHERE id = ?",
+                (json.dumps(item), time.time(), story_id)
+            )
+        return item
+
+
+class HNCrawlCursor(SQLiteStore):
+    """Remembers the last seen maxitem and which story ids were already classified"""
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS hn_crawl_state (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS hn_classified (
+            id INTEGER PRIMARY KEY,
+            is_ai INTEGER NOT NULL,
+            classified_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path=None, retention=None):
+        super().__init__(path)
+        # Ids drop off every listing within days, so older classifications are dead weight
+        self.retention = retention if retention is not None else float(os.getenv('HN_CURSOR_RETENTION', str(14 * 24 * 3600)))
+
+    def get_max_item(self):
+        """Return the maxitem recorded by the previous crawl (0 if none)"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM hn_crawl_state WHERE key = 'max_item'").fetchone()
+        return int(row[0]) if row else 0
+
+    def set_max_item(self, max_item):
+        """Advance the cursor after a crawl"""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO hn_crawl_state (key, value) VALUES ('max_item', ?)", (str(max_item),)
+            )
+
+    def classified(self, story_ids):
+        """Return {story_id: is_ai} for the ids that were classified before"""
+        story_ids = list(story_ids)
+        result = {}
+        with self._connect() as conn:
+            # Stay well under sqlite's bound-parameter limit
+            for start in range(0, len(story_ids), 500):
+                chunk = story_ids[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = conn.execute(
+                    f"SELECT id, is_ai FROM hn_classified WHERE id IN ({placeholders})", chunk
+                ).fetchall()
+                result.update((row[0], bool(row[1])) for row in rows)
+        return result
+
+    def mark_classified(self, results):
+        """Record (story_id, is_ai) pairs and drop classifications past the retention window"""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO hn_classified (id, is_ai, classified_at) VALUES (?, ?, ?)",
+                [(story_id, int(is_ai), now) for story_id, is_ai in results]
+            )
+            conn.execute("DELETE FROM hn_classified WHERE classified_at < ?", (now - self.retention,))
+
+
+class FeedStateCache(SQLiteStore):
+    """Per-feed validators (ETag / Last-Modified) plus the articles parsed from the last full response"""
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS rss_feeds (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            modified TEXT,
+            articles TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+        );
+    """
+
+    def get(self, feed_url):
+        """Return {'etag', 'modified', 'articles'} for a feed, or None if never fetched"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT etag, modified, articles FROM rss_feeds WHERE url = ?", (feed_url,)
+            ).fetchone()
+        if not row:
+            return None
+        return {'etag': row[0], 'modified': row[1], 'articles': json.loads(row[2])}
+
+    def put(self, feed_url, etag, modified, articles):
+        """Store the validators and articles from a 200 response"""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO rss_feeds (url, etag, modified, articles, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (feed_url, etag, modified, json.dumps(articles), time.time())
+            )
+
+
+class NewsAPICache(SQLiteStore):
+    """NewsAPI responses keyed by request parameters, plus a per-day request counter"""
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS newsapi_responses (
+            key TEXT PRIMARY KEY,
+            response TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS newsapi_budget (
+            day TEXT PRIMARY KEY,
+            requests INTEGER NOT NULL
+        );
+    """
+
+    def get(self, key):
+        """Return (response, age_seconds) for a cached request, or None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT response, fetched_at FROM newsapi_responses WHERE key = ?", (key,)
+            ).fetchone()
+        if not row:
+            return None
+        return json.loads(row[0]), time.time() - row[1]
+
+    def put(self, key, response):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO newsapi_responses (key, response, fetched_at) VALUES (?, ?, ?)",
+                (key, json.dumps(response), time.time())
+            )
+
+    def requests_today(self):
+        """Requests recorded for the current UTC day (NewsAPI's quota window)"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT requests FROM newsapi_budget WHERE day = ?", (time.strftime('%Y-%m-%d', time.gmtime()),)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def record_request(self):
+        """Count one request against today's budget"""
+        day = time.strftime('%Y-%m-%d', time.gmtime())
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO newsapi_budget (day, requests) VALUES (?, 1) "
+                "ON CONFLICT(day) DO UPDATE SET requests = requests + 1",
+                (day,)
+            )
+            conn.execute("DELETE FROM newsapi_budget WHERE day < ?", (day,))
+
+
+class SeenArticleStore(SQLiteStore):
+    """Fingerprints (normalized title, canonical url) of articles already delivered in a digest"""
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS seen_articles (
+            fingerprint TEXT PRIMARY KEY,
+            delivered_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path=None, retention_days=None):
+        super().__init__(path)
+        self.retention_days = retention_days if retention_days is not None else float(os.getenv('SEEN_RETENTION_DAYS', '7'))
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM seen_articles WHERE delivered_at < ?", (time.time() - self.retention_days * 86400,))
+
+    @staticmethod
+    def fingerprints(article):
+        """Hashes of the article's canonical title and url"""
+        prints = set()
+        title = canonical_title(article.get('title'), article.get('source'))
+        if title:
+            prints.add('t:' + hashlib.sha1(title.encode()).hexdigest())
+        url = canonical_url(article.get('url'))
+        if url:
+            prints.add('u:' + hashlib.sha1(url.encode()).hexdigest())
+        return prints
+
+    def load(self):
+        """Every fingerprint delivered within the retention window, as a set for O(1) lookups"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT fingerprint FROM seen_articles WHERE delivered_at >= ?",
+                (time.time() - self.retention_days * 86400,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def mark_delivered(self, articles):
+        """Remember the articles that just went out"""
+        now = time.time()
+        rows = [(fingerprint, now) for article in articles for fingerprint in self.fingerprints(article)]
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO seen_articles (fingerprint, delivered_at) VALUES (?, ?)", rows
+            )
+
+
+class SummaryCache(SQLiteStore):
+    """Generated summaries keyed by a hash of the article content and summary settings, with TTL and LRU eviction"""
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS summaries (
+            key TEXT PRIMARY KEY,
+            summary TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path=None, ttl=None, max_entries=None):
+        super().__init__(path)
+        self.ttl = ttl if ttl is not None else float(os.getenv('SUMMARY_CACHE_TTL', str(30 * 24 * 3600)))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv('SUMMARY_CACHE_MAX', '5000'))
+
+    def get(self, key):
+        """Return the cached summary (refreshing its LRU position), or None if missing or expired"""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT summary, created_at FROM summaries WHERE key = ?", (key,)).fetchone()
+            if not row:
+                return None
+            if now - row[1] > self.ttl:
+                conn.execute("DELETE FROM summaries WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE summaries SET accessed_at = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def put(self, key, summary):
+        """Store a summary and evict the least recently used entries beyond max_entries"""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, summary, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, summary, now, now)
+            )
+            conn.execute(
+                "DELETE FROM summaries WHERE key IN "
+                "(SELECT key FROM summaries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+
+class ImageCache(SQLiteStore):
+    """Resolved card images keyed by canonical article url, with LRU eviction
+
+    Pages without an image (or that failed to load) are stored as an empty image url under a
+    shorter TTL, so they are retried now and then instead of on every render.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS images (
+            url TEXT PRIMARY KEY,
+            image_url TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path=None, ttl=None, negative_ttl=None, max_entries=None):
+        super().__init__(path)
+        self.ttl = ttl if ttl is not None else float(os.getenv('IMAGE_CACHE_TTL', str(7 * 24 * 3600)))
+        self.negative_ttl = negative_ttl if negative_ttl is not None else float(os.getenv('IMAGE_CACHE_NEGATIVE_TTL', str(6 * 3600)))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv('IMAGE_CACHE_MAX', '5000'))
+
+    def get(self, article_url):
+        """The cached image url, '' for a cached miss, or None when the article needs resolving"""
+        key = canonical_url(article_url)
+        if not key:
+            return None
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT image_url, created_at FROM images WHERE url = ?", (key,)).fetchone()
+            if not row:
+                return None
+            if now - row[1] > (self.ttl if row[0] else self.negative_ttl):
+                conn.execute("DELETE FROM images WHERE url = ?", (key,))
+                return None
+            conn.execute("UPDATE images SET accessed_at = ? WHERE url = ?", (now, key))
+        return row[0]
+
+    def put(self, article_url, image_url):
+        """Store the article's image url (None for no image) and evict beyond max_entries"""
+        key = canonical_url(article_url)
+        if not key:
+            return
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO images (url, image_url, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, image_url or '', now, now)
+            )
+            conn.execute(
+                "DELETE FROM images WHERE url IN "
+                "(SELECT url FROM images ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
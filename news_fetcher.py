@@ -5,25 +5,80 @@ import requests
 from datetime import datetime
 from newsapi import NewsApiClient
 from fuzzywuzzy import fuzz
-import openai
-import google.generativeai as genai
 import hashlib
+import json
 from bs4 import BeautifulSoup
 from bs4 import BeautifulSoup
 import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from news_cache import HNItemCache, HNCrawlCursor, FeedStateCache, NewsAPICache, SummaryCache, ImageCache
+from llm_providers import OpenAIProvider, GeminiProvider
+from keyword_matcher import KeywordMatcher
+from feed_stream import iter_feed_entries
+from dedup_index import TitleIndex, UnionFind, normalize_title, title_lengths, similar_pairs, similar_pairs_chunk, init_pair_worker
+from canonicalize import canonical_url, canonical_title
+from extractive_summary import extractive_summary
+from prompt_compaction import compact_article, count_tokens
+import xml.etree.ElementTree as ET
+import codecs
+from html.parser import HTMLParser
+from urllib.parse import urljoin
 
 # Load environment variables
 load_dotenv()
 
 class NewsAPI:
-    def __init__(self):
+    def __init__(self, cache=None, use_cache=True):
         api_key = os.getenv('NEWS_API_KEY')
         self.newsapi = NewsApiClient(api_key=api_key)
+        # Responses are shared through the local cache so repeat refreshes don't burn quota
+        self.cache = cache or (NewsAPICache() if use_cache else None)
+        self.cache_ttl = float(os.getenv('NEWSAPI_CACHE_TTL', '900'))
+        # Free tier: 1000 requests/day; inside the reserve we prefer stale responses over new calls
+        self.daily_budget = int(os.getenv('NEWSAPI_DAILY_BUDGET', '1000'))
+        self.budget_reserve = int(os.getenv('NEWSAPI_BUDGET_RESERVE', '100'))
+        # Striped by request key: a fixed pool however many distinct queries come through
+        self._key_locks = [threading.Lock() for _ in range(32)]
+    
+    def _key_lock(self, key):
+        return self._key_locks[hash(key) % len(self._key_locks)]
+    
+    def _request(self, endpoint, **params):
+        """Call a NewsAPI client endpoint through the response cache and daily request budget"""
+        if not self.cache:
+            return getattr(self.newsapi, endpoint)(**params)
+        
+        key = json.dumps([endpoint, params], sort_keys=True)
+        # Identical concurrent requests wait for the first one and then hit the cache
+        with self._key_lock(key):
+            cached = self.cache.get(key)
+            if cached and cached[1] < self.cache_ttl:
+                return cached[0]
+            
+            used = self.cache.requests_today()
+            if used >= self.daily_budget - self.budget_reserve:
+                if cached:
+                    print(f"NewsAPI budget nearly used ({used}/{self.daily_budget}), serving cached response")
+                    return cached[0]
+                if used >= self.daily_budget:
+                    print(f"NewsAPI daily budget exhausted ({used}/{self.daily_budget})")
+                    return None
+            
+            try:
+                response = getattr(self.newsapi, endpoint)(**params)
+            finally:
+                self.cache.record_request()
+            if response and response.get('status') == 'ok':
+                self.cache.put(key, response)
+            return response
     
     def get_ai_news(self, query="artificial intelligence", page_size=20):
         """Fetch AI news from NewsAPI using official client"""
         try:
-            response = self.newsapi.get_everything(
+            response = self._request(
+                'get_everything',
                 q=query,
                 language='en',
                 sort_by='publishedAt',
@@ -34,10 +89,55 @@ class NewsAPI:
             print(f"Error fetching from NewsAPI: {e}")
             return None
 
+    def iter_ai_news(self, query="artificial intelligence", page_size=20, max_pages=5):
+        """Lazily page through NewsAPI results, yielding normalized articles one at a time"""
+        for page in range(1, max_pages + 1):
+            try:
+                response = self._request(
+                    'get_everything',
+                    q=query,
+                    language='en',
+                    sort_by='publishedAt',
+                    page_size=page_size,
+                    page=page
+                )
+            except Exception as e:
+                # The free tier caps results at 100 and answers later pages with an error
+                print(f"Error fetching page {page} from NewsAPI: {e}")
+                return
+            
+            if not response or response.get('status') != 'ok':
+                return
+            
+            articles = response.get('articles', [])
+            for article in articles:
+                if article.get('title') and article['title'] != '[Removed]':
+                    yield self.normalize_article(article)
+            
+            if len(articles) < page_size or page * page_size >= response.get('totalResults', 0):
+                return
+    
+    @staticmethod
+    def normalize_article(article):
+        """Convert a NewsAPI article into the common article format"""
+        normalized = {
+            'title': article['title'],
+            'url': article['url'],
+            'source': article['source']['name'],
+            'published': article['publishedAt'],
+            'description': article.get('description') or '',
+            'content': article.get('content') or '',
+            'score': 0  # NewsAPI doesn't have scores
+        }
+        if article.get('urlToImage'):
+            normalized['image_url'] = article['urlToImage']
+        return normalized
+
     def get_top_ai_headlines(self, page_size=20):
         """Get top AI headlines"""
         try:
-            response = self.newsapi.get_top_headlines(
+            response = self._request(
+                'get_top_headlines',
                 q='artificial intelligence',
                 language='en',
                 page_size=page_size
@@ -47,9 +147,85 @@ class NewsAPI:
             print(f"Error fetching top headlines: {e}")
             return None
 
+AI_KEYWORDS = ['ai', 'artificial intelligence', 'machine learning', 'ml', 
+               'neural', 'llm', 'gpt', 'openai', 'deepmind', 'chatgpt']
+# Compiled once; every story title is checked against it
+AI_MATCHER = KeywordMatcher(AI_KEYWORDS)
+
 class HackerNewsFetcher:
-    def __init__(self):
+    def __init__(self, max_workers=None, item_cache=None, use_cache=True, crawl_cursor=None):
         self.base_url = "https://hacker-news.firebaseio.com/v0"
+        # Number of item requests kept in flight at once (1 = sequential)
+        self.max_workers = max_workers or int(os.getenv('HN_MAX_WORKERS', '8'))
+        # Items are read from the local store first and only re-fetched once stale
+        self.item_cache = item_cache or (HNItemCache() if use_cache else None)
+        # Created on first crawl so plain get_ai_stories callers don't touch the cursor tables
+        self._crawl_cursor = crawl_cursor
+    
+    def _get_json(self, path):
+        """GET a Firebase path, returning the decoded JSON or None on failure"""
+        try:
+            response = requests.get(f"{self.base_url}/{path}.json", timeout=5)
+            if response.status_code == 200:
+                return response.json()
+        except Exception as e:
+            print(f"Error fetching Hacker News {path}: {e}")
+        return None
+    
+    def _fetch_item(self, story_id):
+        """Fetch a single Hacker News item, returning None on failure"""
+        cached = self.item_cache.get(story_id) if self.item_cache else None
+        if cached:
+            item, needs_full_fetch, needs_score_refresh = cached
+            if not needs_full_fetch:
+                if needs_score_refresh:
+                    # Firebase serves child paths, so only the score travels over the wire
+                    score = self._get_json(f"item/{story_id}/score")
+                    if score is not None:
+                        item = self.item_cache.update_score(story_id, item, score)
+                return item
+        
+        item = self._get_json(f"item/{story_id}")
+        if item and self.item_cache:
+            self.item_cache.put(story_id, item)
+        # Serve the stale copy rather than nothing when the refetch fails
+        return item or (cached[0] if cached else None)
+    
+    def _iter_items(self, story_ids):
+        """Yield (story_id, item) pairs in order while keeping up to max_workers requests in flight"""
+        story_ids = iter(story_ids)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        pending = deque()
+        try:
+            for story_id in story_ids:
+                pending.append((story_id, executor.submit(self._fetch_item, story_id)))
+                if len(pending) >= self.max_workers:
+                    break
+            
+            while pending:
+                story_id, future = pending.popleft()
+                item = future.result()
+                # Top up the window before handing the result back
+                next_id = next(story_ids, None)
+                if next_id is not None:
+                    pending.append((next_id, executor.submit(self._fetch_item, next_id)))
+                yield story_id, item
+        finally:
+            # Runs when the caller stops early: drop queued requests, don't wait for in-flight ones
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _story_to_article(self, story_id, story):
+        """Convert a Hacker News item into the common article format"""
+        return {
+            'title': story['title'],
+            'url': story.get('url', f"https://news.ycombinator.com/item?id={story_id}"),
+            'source': 'Hacker News',
+            'published': datetime.fromtimestamp(story.get('time', 0)).isoformat() if story.get('time') else 'Unknown',
+            'description': story.get('text', '')[:200] + '...' if story.get('text') else '',
+            'score': story.get('score', 0)
+        }
     
     def get_ai_stories(self, limit=20):
         """Fetch AI-related stories from Hacker News"""
@@ -61,112 +237,591 @@ class HackerNewsFetcher:
             story_ids = response.json()[:100]  # Get top 100 to filter
             
             ai_stories = []
-            ai_keywords = ['ai', 'artificial intelligence', 'machine learning', 'ml', 
-                          'neural', 'llm', 'gpt', 'openai', 'deepmind', 'chatgpt']
-            
-            for story_id in story_ids[:limit*2]:  # Get extra to account for filtering
-                story_url = f"{self.base_url}/item/{story_id}.json"
-                story_response = requests.get(story_url, timeout=5)
-                if story_response.status_code == 200:
-                    story = story_response.json()
+            
+            # Get extra to account for filtering; items come back in story order
+            items = self._iter_items(story_ids[:limit*2])
+            try:
+                for story_id, story in items:
+                    if self._is_ai_story(story):
+                        ai_stories.append(self._story_to_article(story_id, story))
                     
-                    if story and story.get('title'):
-                        title_lower = story['title'].lower()
-                        if any(keyword in title_lower for keyword in ai_keywords):
-                            ai_stories.append({
-                                'title': story['title'],
-                                'url': story.get('url', f"https://news.ycombinator.com/item?id={story_id}"),
-                                'source': 'Hacker News',
-                                'published': datetime.fromtimestamp(story.get('time', 0)).isoformat() if story.get('time') else 'Unknown',
-                                'description': story.get('text', '')[:200] + '...' if story.get('text') else '',
-                                'score': story.get('score', 0)
-                            })
-                
-                if len(ai_stories) >= limit:
-                    break
+                    if len(ai_stories) >= limit:
+                        break
+            finally:
+                items.close()
             
             return ai_stories
         except Exception as e:
             print(f"Error fetching from Hacker News: {e}")
             return []
+    
+    @property
+    def crawl_cursor(self):
+        if self._crawl_cursor is None:
+            self._crawl_cursor = HNCrawlCursor()
+        return self._crawl_cursor
+    
+    def crawl_ai_stories(self, limit=20, lists=('topstories', 'beststories', 'newstories'), max_new_items=None):
+        """Incrementally crawl the story listings, classifying only ids not seen in earlier runs"""
+        try:
+            max_new_items = max_new_items or int(os.getenv('HN_CRAWL_BUDGET', '100'))
+            cursor = self.crawl_cursor
+            
+            # Merge the listings, keeping the first (highest-ranked) position of each id
+            story_ids = []
+            listed = set()
+            for list_name in lists:
+                for story_id in self._get_json(list_name) or []:
+                    if story_id not in listed:
+                        listed.add(story_id)
+                        story_ids.append(story_id)
+            
+            max_item = self._get_json('maxitem')
+            last_max_item = cursor.get_max_item()
+            if max_item and last_max_item:
+                print(f"Hacker News: {max(max_item - last_max_item, 0)} new items since last crawl")
+            
+            # Classify unseen ids bounded per run, the rest wait for the next run. Items posted since the
+            # cursor go first (in listing order), then older ids that only just reached a listing.
+            is_ai = cursor.classified(story_ids)
+            unseen_ids = [story_id for story_id in story_ids if story_id not in is_ai]
+            unseen_ids.sort(key=lambda story_id: story_id <= last_max_item)
+            new_ids = unseen_ids[:max_new_items]
+            fetched = {}
+            results = []
+            for story_id, story in self._iter_items(new_ids):
+                if story is None:
+                    continue  # Failed fetch, retry next run
+                is_ai[story_id] = self._is_ai_story(story)
+                results.append((story_id, is_ai[story_id]))
+                fetched[story_id] = story
+            
+            cursor.mark_classified(results)
+            # Only advance past items that were actually classified, so deferred new ones keep their priority
+            deferred_new = [story_id for story_id in unseen_ids[max_new_items:] if story_id > last_max_item]
+            if deferred_new:
+                cursor.set_max_item(min(deferred_new) - 1)
+            elif max_item:
+                cursor.set_max_item(max_item)
+            print(f"Hacker News: classified {len(results)} new stories, "
+                  f"{len(story_ids) - len(unseen_ids)} already known, {len(unseen_ids) - len(new_ids)} deferred")
+            
+            # Previously classified AI stories come from the item cache (score-only refresh at most)
+            ai_ids = [story_id for story_id in story_ids if is_ai.get(story_id)]
+            ai_stories = []
+            known_ids = [story_id for story_id in ai_ids[:limit] if story_id not in fetched]
+            known = dict(self._iter_items(known_ids))
+            for story_id in ai_ids[:limit]:
+                story = fetched.get(story_id) or known.get(story_id)
+                if story and story.get('title'):
+                    ai_stories.append(self._story_to_article(story_id, story))
+            
+            return ai_stories
+        except Exception as e:
+            print(f"Error crawling Hacker News: {e}")
+            return []
+    
+    def _is_ai_story(self, story):
+        """Check whether an item is a story with an AI-related title"""
+        if not story or not story.get('title'):
+            return False
+        return AI_MATCHER.matches(story['title'])
+
+# Sidebar source name -> feed url
+RSS_FEEDS = {
+    "Google News": "https://news.google.com/rss/search?q=artificial+intelligence",
+    "TechCrunch": "https://techcrunch.com/feed/",
+    "Ars Technica": "https://feeds.arstechnica.com/arstechnica/index"
+}
 
 class RSSFetcher:
-    def __init__(self):
-        self.rss_feeds = [
-            "https://news.google.com/rss/search?q=artificial+intelligence",
-            "https://techcrunch.com/feed/",
-            "https://feeds.arstechnica.com/arstechnica/index"
-        ]
+    def __init__(self, feeds=None, max_workers=None, feed_cache=None, use_cache=True):
+        self.rss_feeds = list(feeds or RSS_FEEDS.values())
+        # Feeds are independent, so by default all of them are fetched at once
+        self.max_workers = max_workers or int(os.getenv('RSS_MAX_WORKERS', '0')) or len(self.rss_feeds)
+        # ETag / Last-Modified per feed, so unchanged feeds come back as an empty 304
+        self.feed_cache = feed_cache or (FeedStateCache() if use_cache else None)
+        self.entries_per_feed = 10
+    
+    def _fetch_feed(self, feed_url):
+        """Fetch and parse one feed, reusing the cached entries when the server answers 304"""
+        state = self.feed_cache.get(feed_url) if self.feed_cache else None
+        previous = state['articles'] if state else []
+        try:
+            headers = {'User-Agent': 'Mozilla/5.0 (compatible; AI News Scraper)'}
+            if state and state['etag']:
+                headers['If-None-Match'] = state['etag']
+            if state and state['modified']:
+                headers['If-Modified-Since'] = state['modified']
+            
+            with requests.get(feed_url, headers=headers, timeout=10, stream=True) as response:
+                if response.status_code == 304 and state:
+                    print(f"Parsing {feed_url}: Not modified, reusing {len(previous)} cached entries")
+                    return previous
+                response.raise_for_status()
+                
+                new_articles = self._parse_feed_stream(feed_url, response, previous)
+            
+            # New entries first, then whatever from the last run is still within the limit
+            new_guids = {article.get('guid') for article in new_articles}
+            articles = new_articles + [a for a in previous if a.get('guid') not in new_guids]
+            articles = articles[:self.entries_per_feed]
+            
+            if self.feed_cache:
+                self.feed_cache.put(feed_url, response.headers.get('ETag'), response.headers.get('Last-Modified'), articles)
+            return articles
+        except Exception as e:
+            print(f"Error fetching RSS from {feed_url}: {e}")
+            # Last known entries beat an empty section
+            return previous
+    
+    def _parse_feed_stream(self, feed_url, response, previous):
+        """Stream-parse entries until the limit or the first GUID seen in the previous run"""
+        received = []
+        
+        def chunks():
+            for chunk in response.iter_content(chunk_size=16384):
+                received.append(chunk)
+                yield chunk
+        
+        stop_guids = {article.get('guid') for article in previous if article.get('guid')}
+        try:
+            articles = list(iter_feed_entries(chunks(), self.entries_per_feed, stop_guids))
+            print(f"Parsing {feed_url}: Read {len(articles)} new entries from {sum(map(len, received))} bytes")
+            return articles
+        except ET.ParseError:
+            # Not well-formed XML (HTML entities, broken markup): let feedparser deal with the whole document
+            body = b''.join(received) + response.raw.read(decode_content=True)
+            feed = feedparser.parse(body, response_headers=dict(response.headers))
+            print(f"Parsing {feed_url}: Found {len(feed.entries)} entries (feedparser fallback)")
+            
+            articles = []
+            for entry in feed.entries[:self.entries_per_feed]:
+                article = {
+                    'title': entry.title,
+                    'url': entry.link,
+                    'published': entry.get('published', 'Unknown'),
+                    'source': feed.feed.title if hasattr(feed, 'feed') and hasattr(feed.feed, 'title') else 'RSS',
+                    'description': entry.get('description', entry.get('summary', '')),
+                    'guid': entry.get('id', entry.get('link'))
+                }
+                if article['guid'] in stop_guids:
+                    break
+                articles.append(article)
+            return articles
     
-    def fetch_rss_news(self):
-        """Fetch news from RSS feeds"""
+    def fetch_rss_news(self, feed_urls=None):
+        """Fetch news from RSS feeds (all configured feeds unless a subset is given)"""
         all_articles = []
+        feed_urls = self.rss_feeds if feed_urls is None else feed_urls
+        if not feed_urls:
+            return all_articles
         
-        for feed_url in self.rss_feeds:
-            try:
-                feed = feedparser.parse(feed_url)
-                print(f"Parsing {feed_url}: Found {len(feed.entries)} entries")
-                
-                for entry in feed.entries[:10]:
-                    article = {
-                        'title': entry.title,
-                        'url': entry.link,
-                        'published': entry.get('published', 'Unknown'),
-                        'source': feed.feed.title if hasattr(feed, 'feed') and hasattr(feed.feed, 'title') else 'RSS',
-                        'description': entry.get('description', entry.get('summary', ''))
-                    }
-                    all_articles.append(article)
-            except Exception as e:
-                print(f"Error fetching RSS from {feed_url}: {e}")
+        # Total time is roughly the slowest feed; map keeps the configured feed order
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(feed_urls))) as executor:
+            for articles in executor.map(self._fetch_feed, feed_urls):
+                all_articles.extend(articles)
         
         return all_articles
 
+class SourceRegistry:
+    """Maps sidebar source names to fetchers that are only constructed the first time they're used"""
+    
+    def __init__(self):
+        self._factories = {
+            "NewsAPI": NewsAPI,
+            "Hacker News": HackerNewsFetcher
+        }
+        # One entry per feed, all backed by a single fetcher so selected feeds still download concurrently
+        for name in RSS_FEEDS:
+            self._factories[name] = RSSFetcher
+        self._instances = {}
+        self._lock = threading.Lock()
+    
+    @property
+    def source_names(self):
+        return list(self._factories)
+    
+    def get(self, name):
+        """Return the fetcher behind a source name, constructing it on first use"""
+        factory = self._factories[name]
+        with self._lock:
+            if factory not in self._instances:
+                self._instances[factory] = factory()
+            return self._instances[factory]
+    
+    def fetch_rss(self, names):
+        """Fetch only the RSS feeds among the selected source names"""
+        selected = [name for name in names if name in RSS_FEEDS]
+        if not selected:
+            return []
+        return self.get(selected[0]).fetch_rss_news(feed_urls=[RSS_FEEDS[name] for name in selected])
+
 class ArticleDeduplicator:
     @staticmethod
-    def remove_duplicates(articles, similarity_threshold=80):
-        """Remove duplicate articles based on title similarity"""
+    def take_unique(articles, limit, similarity_threshold=80, exclude_matcher=None):
+        """Consume articles lazily until `limit` non-excluded, non-duplicate ones are collected"""
+        unique_articles = []
+        processed_titles = []
+        
+        for article in articles:
+            if exclude_matcher and exclude_matcher.matches(article.get('title'), article.get('description')):
+                continue
+            
+            title = normalize_title(article.get('title', ''))
+            if any(fuzz.ratio(title, processed_title) > similarity_threshold for processed_title in processed_titles):
+                continue
+            
+            unique_articles.append(article)
+            processed_titles.append(title)
+            if len(unique_articles) >= limit:
+                break
+        
+        return unique_articles
+    
+    @staticmethod
+    def remove_exact_duplicates(articles):
+        """Drop articles whose canonical url or canonical title was already seen, in one O(n) pass"""
+        unique_articles = []
+        seen_urls = set()
+        seen_titles = set()
+        
+        for article in articles:
+            url = canonical_url(article.get('url'))
+            title = canonical_title(article.get('title'), article.get('source'))
+            if (url and url in seen_urls) or (title and title in seen_titles):
+                continue
+            seen_urls.add(url)
+            seen_titles.add(title)
+            unique_articles.append(article)
+        
+        return unique_articles
+    
+    # Below this size the plain pairwise loop is cheap and exact; above it candidates come from the LSH index
+    INDEX_MIN_ARTICLES = 200
+    
+    @staticmethod
+    def remove_duplicates(articles, similarity_threshold=80, use_index=None, seen_store=None):
+        """Remove duplicate articles based on title similarity (and, with a seen_store, already-delivered ones)"""
         if not articles:
             return articles
         
+        if seen_store is not None:
+            # Cheap hash lookups before any fuzzy matching, image scraping or summaries
+            seen = seen_store.load()
+            fresh_articles = [article for article in articles if not (seen_store.fingerprints(article) & seen)]
+            print(f"Skipped {len(articles) - len(fresh_articles)} already delivered articles")
+            articles = fresh_articles
+        
+        # Exact matches after canonicalization never need to reach the fuzzy stage
+        original_count = len(articles)
+        articles = ArticleDeduplicator.remove_exact_duplicates(articles)
+        print(f"Removed {original_count - len(articles)} exact duplicates")
+        
+        if use_index is None:
+            use_index = len(articles) >= ArticleDeduplicator.INDEX_MIN_ARTICLES
+        
         unique_articles = []
         processed_titles = []
+        # Tighter bands at high thresholds keep candidate lists short; looser ones keep recall at low thresholds
+        index = TitleIndex(bands=32, rows=3 if similarity_threshold >= 75 else 2) if use_index else None
         
         for article in articles:
-            title = article.get('title', '')
-            is_duplicate = False
+            title = normalize_title(article.get('title', ''))
             
-            for processed_title in processed_titles:
-                similarity = fuzz.ratio(title.lower(), processed_title.lower())
-                if similarity > similarity_threshold:
-                    is_duplicate = True
-                    break
+            if index is not None:
+                candidates = (index.title(key) for key in index.candidates(title))
+            else:
+                candidates = processed_titles
+            is_duplicate = any(fuzz.ratio(title, processed_title) > similarity_threshold for processed_title in candidates)
             
             if not is_duplicate:
+                if index is not None:
+                    index.add(len(unique_articles), title)
                 unique_articles.append(article)
                 processed_titles.append(title)
         
         print(f"Removed {len(articles) - len(unique_articles)} duplicates")
         return unique_articles
 
+    @staticmethod
+    def cluster_duplicates(articles, similarity_threshold=80, workers=None, chunk_size=256):
+        """Batch mode: group articles into duplicate clusters from all pairwise title similarities
+        
+        Row chunks of the similarity matrix are spread over a process pool and every pair above
+        the threshold (or sharing a canonical url) is merged with union-find, so clusters are
+        transitive rather than greedy first-seen. Returns lists of articles in input order.
+        """
+        if not articles:
+            return []
+        
+        titles = [normalize_title(article.get('title', '')) for article in articles]
+        clusters = UnionFind(len(articles))
+        
+        # Same canonical url is always the same story
+        first_with_url = {}
+        for i, article in enumerate(articles):
+            url = canonical_url(article.get('url'))
+            if url:
+                clusters.union(first_with_url.setdefault(url, i), i)
+        
+        # Later rows have fewer pairs, so equal-sized chunks are front-loaded; the pool balances them out
+        chunks = [(start, min(start + chunk_size, len(titles))) for start in range(0, len(titles), chunk_size)]
+        if len(chunks) == 1 or workers == 1:
+            lengths = title_lengths(titles)
+            results = [similar_pairs(titles, lengths, start, stop, similarity_threshold) for start, stop in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_pair_worker, initargs=(titles,)) as executor:
+                futures = [executor.submit(similar_pairs_chunk, start, stop, similarity_threshold) for start, stop in chunks]
+                results = [future.result() for future in futures]
+        
+        for pairs in results:
+            for i, j in pairs:
+                clusters.union(i, j)
+        
+        return [[articles[i] for i in members] for members in clusters.groups()]
+    
+    @staticmethod
+    def remove_duplicates_batch(articles, similarity_threshold=80, workers=None):
+        """Batch alternative to remove_duplicates keeping the highest-score member of each cluster"""
+        clusters = ArticleDeduplicator.cluster_duplicates(articles, similarity_threshold, workers)
+        # max() keeps the first-seen member on ties
+        unique_articles = [max(cluster, key=lambda article: article.get('score', 0) or 0) for cluster in clusters]
+        print(f"Removed {len(articles) - len(unique_articles)} duplicates in {len(clusters)} clusters")
+        return unique_articles
+
+class IncrementalDeduplicator:
+    """Dedup state held across refreshes (e.g. in st.session_state)
+    
+    Articles already classified in an earlier batch reuse their verdict; only newly arrived ones
+    are compared against the index, and articles that disappeared from the feed are evicted, so a
+    refresh costs O(changed articles) rather than O(all articles).
+    """
+    
+    def __init__(self, similarity_threshold=80):
+        self.similarity_threshold = similarity_threshold
+        self._index = TitleIndex(bands=32, rows=3 if similarity_threshold >= 75 else 2)
+        # Exact stage, as in remove_duplicates: canonical title -> key of the indexed article
+        self._canonical_titles = {}
+        self._duplicate_of = {}
+        self.last_stats = {}
+    
+    @staticmethod
+    def _article_key(article):
+        return canonical_url(article.get('url')) or 't:' + canonical_title(article.get('title'), article.get('source'))
+    
+    def _find_duplicate(self, title):
+        """Key of an indexed title similar enough to this one, or None"""
+        # Small indexes are scanned exactly; the LSH buckets only take over where the scan would hurt
+        if len(self._index) < ArticleDeduplicator.INDEX_MIN_ARTICLES:
+            candidates = self._index.keys()
+        else:
+            candidates = self._index.candidates(title)
+        for key in candidates:
+            if fuzz.ratio(title, self._index.title(key)) > self.similarity_threshold:
+                return key
+        return None
+    
+    def update(self, articles):
+        """Return the unique articles of this batch, comparing only the ones not seen last time"""
+        keys = [self._article_key(article) for article in articles]
+        current = set(keys)
+        
+        # Evict whatever is no longer being served, so it can't shadow new arrivals
+        evicted = [key for key in self._index.keys() if key not in current]
+        for key in evicted:
+            self._index.remove(key)
+        self._canonical_titles = {
+            title: key for title, key in self._canonical_titles.items() if key in self._index
+        }
+        self._duplicate_of = {
+            key: kept for key, kept in self._duplicate_of.items() if key in current and kept in self._index
+        }
+        
+        unique_articles = []
+        batch_keys = set()
+        compared = 0
+        for article, key in zip(articles, keys):
+            if key in batch_keys:
+                continue
+            batch_keys.add(key)
+            
+            if key in self._index:
+                unique_articles.append(article)
+                continue
+            if key in self._duplicate_of:
+                continue
+            
+            compared += 1
+            # Exact canonical-title match first (drops e.g. Google News " - Publisher" suffixes), then fuzzy
+            canonical = canonical_title(article.get('title'), article.get('source'))
+            title = normalize_title(article.get('title', ''))
+            duplicate_of = self._canonical_titles.get(canonical) if canonical else None
+            if duplicate_of is None:
+                duplicate_of = self._find_duplicate(title)
+            if duplicate_of is None:
+                self._index.add(key, title)
+                if canonical:
+                    self._canonical_titles[canonical] = key
+                unique_articles.append(article)
+            else:
+                self._duplicate_of[key] = duplicate_of
+        
+        self.last_stats = {'compared': compared, 'reused': len(batch_keys) - compared, 'evicted': len(evicted)}
+        print(f"Incremental dedup: compared {compared} new articles, reused {len(batch_keys) - compared}, evicted {len(evicted)}")
+        return unique_articles
+
 class AISummaryGenerator:
-    def __init__(self):
+    def __init__(self, cache=None, use_cache=True):
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
         self.google_api_key = os.getenv('GOOGLE_API_KEY')
+        self.openai_model = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
+        self.gemini_model = os.getenv('GEMINI_MODEL', 'gemini-1.5-flash')
+        # Summaries are shared on disk across sessions and the schedulers
+        self.cache = cache or (SummaryCache() if use_cache else None)
+        
+        # Long-lived clients with timeouts, retries and rate limiting
+        self.openai = OpenAIProvider(self.openai_api_key, self.openai_model) if self.openai_api_key else None
+        self.gemini = GeminiProvider(self.google_api_key, self.gemini_model) if self.google_api_key else None
+        
+        # 'auto' mode: the primary gets a head start, the other provider is hedged in after hedge_delay()
+        self.primary_provider = os.getenv('SUMMARY_PRIMARY_PROVIDER', 'openai')
+        self.hedge_quantile = float(os.getenv('SUMMARY_HEDGE_QUANTILE', '0.5'))
+        self.hedge_default_delay = float(os.getenv('SUMMARY_HEDGE_DELAY', '2.0'))
+        self.hedge_min_samples = int(os.getenv('SUMMARY_HEDGE_MIN_SAMPLES', '5'))
+        self._hedge_pool = None
+        self._hedge_pool_lock = threading.Lock()
         
-        if self.openai_api_key:
-            openai.api_key = self.openai_api_key
+        # Token budget for the article text in each summary prompt
+        self.prompt_tokens = int(os.getenv('SUMMARY_PROMPT_TOKENS', '300'))
         
-        if self.google_api_key:
-            genai.configure(api_key=self.google_api_key)
+        # Missing keys and failed requests fall back to the offline extractive summary
+        self.local_fallback = os.getenv('SUMMARY_LOCAL_FALLBACK', '1') == '1'
     
-    def summarize_with_openai(self, title, description, content="", adhd_friendly=False):
-        """Generate summary using OpenAI"""
-        try:
-            if not self.openai_api_key:
-                return "OpenAI API key not configured"
-            
-            text_to_summarize = f"Title: {title}\nDescription: {description}\nContent: {content[:1000]}"
-            
+    def summary_key(self, title, description, content, provider, adhd_friendly):
+        """Content-addressed cache key: same article + same settings = same summary"""
+        if provider == 'auto':
+            model = f"{self.openai_model}|{self.gemini_model}"
+        elif provider == 'local':
+            model = 'extractive'
+        else:
+            model = self.openai_model if provider == 'openai' else self.gemini_model
+        payload = json.dumps([title, description, content, provider, model, bool(adhd_friendly)])
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def get_cached_summary(self, title, description, content, provider, adhd_friendly=False):
+        """Return a previously generated summary without calling any API, or None
+        
+        'auto' also accepts a summary cached by either provider, since that is what it would return.
+        """
+        if not self.cache:
+            return None
+        for name in (provider, 'openai', 'gemini') if provider == 'auto' else (provider,):
+            summary = self.cache.get(self.summary_key(title, description, content, name, adhd_friendly))
+            if summary is not None:
+                return summary
+        return None
+    
+    def summarize(self, title, description, content="", provider="openai", adhd_friendly=False):
+        """Generate a summary with the given provider ('openai', 'gemini' or 'auto')"""
+        if provider == 'openai':
+            return self.summarize_with_openai(title, description, content, adhd_friendly)
+        if provider == 'gemini':
+            return self.summarize_with_gemini(title, description, content, adhd_friendly)
+        if provider == 'auto':
+            return self.summarize_fastest(title, description, content, adhd_friendly)
+        if provider == 'local':
+            return self.summarize_locally(title, description, content, adhd_friendly)
+        return "AI summary not available"
+    
+    def summarize_locally(self, title, description, content="", adhd_friendly=False):
+        """Extractive summary from the article's own sentences; no network, never cached"""
+        return extractive_summary(title, description or '', content or '', adhd_friendly)
+    
+    def _fallback(self, error, title, description, content, adhd_friendly):
+        """The local summary in place of a provider error, or the error itself when fallback is off"""
+        if not self.local_fallback:
+            return error
+        print(f"{error}; using local summary")
+        return self.summarize_locally(title, description, content, adhd_friendly)
+    
+    def hedge_delay(self, provider):
+        """Seconds to wait on a provider before hedging, from its recent latency distribution"""
+        client = self.openai if provider == 'openai' else self.gemini
+        if client is None or client.latency.samples < self.hedge_min_samples:
+            return self.hedge_default_delay
+        return client.latency.quantile(self.hedge_quantile)
+    
+    def _get_hedge_pool(self):
+        with self._hedge_pool_lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(
+                    max_workers=int(os.getenv('SUMMARY_HEDGE_WORKERS', '8')),
+                    thread_name_prefix='summary-hedge'
+                )
+            return self._hedge_pool
+    
+    def _generate(self, provider, title, description, content, adhd_friendly, cancel=None):
+        client = self.openai if provider == 'openai' else self.gemini
+        return client.generate(**self._build_request(title, description, content, provider, adhd_friendly), cancel=cancel)
+    
+    def summarize_fastest(self, title, description, content="", adhd_friendly=False):
+        """Hedged summary: ask the primary provider, race the secondary if it is slow, keep the first answer"""
+        available = [name for name, client in (('openai', self.openai), ('gemini', self.gemini)) if client]
+        if not available:
+            return self._fallback("No AI provider API key configured", title, description, content, adhd_friendly)
+        
+        key = self.summary_key(title, description, content, 'auto', adhd_friendly)
+        # Every successful answer also lands under the 'auto' key, which is what the app and prefetcher look up
+        for provider in ('auto', *available):
+            cached = self.cache.get(self.summary_key(title, description, content, provider, adhd_friendly)) if self.cache else None
+            if cached is not None:
+                if provider != 'auto':
+                    self.cache.put(key, cached)
+                return cached
+        
+        if len(available) == 1:
+            summary = self.summarize(title, description, content, available[0], adhd_friendly)
+            # Errors and fallbacks aren't cached under the provider key, so they stay out of 'auto' too
+            if self.cache and self.cache.get(self.summary_key(title, description, content, available[0], adhd_friendly)) is not None:
+                self.cache.put(key, summary)
+            return summary
+        
+        primary = self.primary_provider if self.primary_provider in available else available[0]
+        secondary = next(name for name in available if name != primary)
+        pool = self._get_hedge_pool()
+        cancel = threading.Event()
+        futures = {pool.submit(self._generate, primary, title, description, content, adhd_friendly, cancel): primary}
+        
+        # An early failure of the primary hedges immediately rather than after the delay
+        done, _ = wait(futures, timeout=self.hedge_delay(primary))
+        if not done or next(iter(done)).exception() is not None:
+            futures[pool.submit(self._generate, secondary, title, description, content, adhd_friendly, cancel)] = secondary
+        
+        pending = set(futures)
+        errors = []
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    errors.append(f"{futures[future]}: {future.exception()}")
+                    continue
+                # The loser can't be interrupted mid-request, but it won't start another attempt
+                cancel.set()
+                for other in pending:
+                    other.cancel()
+                summary = future.result()
+                if self.cache:
+                    self.cache.put(key, summary)
+                    self.cache.put(self.summary_key(title, description, content, futures[future], adhd_friendly), summary)
+                return summary
+        return self._fallback(f"Summary error: {'; '.join(errors)}", title, description, content, adhd_friendly)
+    
+    def _build_request(self, title, description, content, provider, adhd_friendly):
+        """Prompt and generation settings for one article, as keyword arguments for the provider client"""
+        text_to_summarize = self._article_text(title, description, content)
+        
+        if provider == 'openai':
             if adhd_friendly:
                 system_prompt = """You are an AI news analyst specializing in ADHD-friendly summaries. Create summaries that are:
 - Bullet points instead of paragraphs
@@ -180,45 +835,198 @@ class AISummaryGenerator:
                 system_prompt = "You are an AI news analyst. Provide concise, informative summaries of AI-related articles. Focus on key insights, implications, and what makes this newsworthy."
                 user_prompt = f"Summarize this AI news article in 2-3 sentences:\n\n{text_to_summarize}"
             
-            client = openai.OpenAI()
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                max_tokens=200 if adhd_friendly else 150,
-                temperature=0.3
-            )
-            return response.choices[0].message.content
+            return {
+                'prompt': user_prompt,
+                'system_prompt': system_prompt,
+                'max_tokens': 200 if adhd_friendly else 150,
+                'temperature': 0.3
+            }
+        
+        if adhd_friendly:
+            prompt = f"""Create an ADHD-friendly summary of this AI news article. Use this format:
+
+• **Key Insight:** [main point in one sentence]
+• **Why It Matters:** [implications and context]  
+• **Bottom Line:** [actionable takeaway or what to expect]
+
+Article to summarize:
+{text_to_summarize}"""
+        else:
+            prompt = f"Summarize this AI news article in 2-3 sentences, focusing on key insights and implications:\n\n{text_to_summarize}"
+        return {'prompt': prompt}
+    
+    def summarize_with_openai(self, title, description, content="", adhd_friendly=False):
+        """Generate summary using OpenAI"""
+        try:
+            if not self.openai_api_key:
+                return self._fallback("OpenAI API key not configured", title, description, content, adhd_friendly)
+            
+            cached = self.get_cached_summary(title, description, content, 'openai', adhd_friendly)
+            if cached is not None:
+                return cached
+            
+            summary = self.openai.generate(**self._build_request(title, description, content, 'openai', adhd_friendly))
+            if self.cache:
+                self.cache.put(self.summary_key(title, description, content, 'openai', adhd_friendly), summary)
+            return summary
         except Exception as e:
-            return f"OpenAI summary error: {str(e)}"
+            return self._fallback(f"OpenAI summary error: {str(e)}", title, description, content, adhd_friendly)
     
     def summarize_with_gemini(self, title, description, content="", adhd_friendly=False):
         """Generate summary using Google Gemini"""
         try:
             if not self.google_api_key:
-                return "Google API key not configured"
+                return self._fallback("Google API key not configured", title, description, content, adhd_friendly)
             
-            model = genai.GenerativeModel('gemini-1.5-flash')
-            text_to_summarize = f"Title: {title}\nDescription: {description}\nContent: {content[:1000]}"
+            cached = self.get_cached_summary(title, description, content, 'gemini', adhd_friendly)
+            if cached is not None:
+                return cached
             
-            if adhd_friendly:
-                prompt = f"""Create an ADHD-friendly summary of this AI news article. Use this format:
-
-• **Key Insight:** [main point in one sentence]
-• **Why It Matters:** [implications and context]  
-• **Bottom Line:** [actionable takeaway or what to expect]
-
-Article to summarize:
-{text_to_summarize}"""
+            summary = self.gemini.generate(**self._build_request(title, description, content, 'gemini', adhd_friendly))
+            if self.cache:
+                self.cache.put(self.summary_key(title, description, content, 'gemini', adhd_friendly), summary)
+            return summary
+        except Exception as e:
+            return self._fallback(f"Gemini summary error: {str(e)}", title, description, content, adhd_friendly)
+    
+    def stream_with_openai(self, title, description, content="", adhd_friendly=False):
+        """Stream an OpenAI summary as text chunks"""
+        return self._stream('openai', self.openai_api_key, "OpenAI", title, description, content, adhd_friendly)
+    
+    def stream_with_gemini(self, title, description, content="", adhd_friendly=False):
+        """Stream a Gemini summary as text chunks"""
+        return self._stream('gemini', self.google_api_key, "Gemini", title, description, content, adhd_friendly)
+    
+    def stream_summary(self, title, description, content="", provider="openai", adhd_friendly=False):
+        """Stream a summary with the given provider ('openai', 'gemini' or 'auto')"""
+        if provider == 'openai':
+            return self.stream_with_openai(title, description, content, adhd_friendly)
+        if provider == 'gemini':
+            return self.stream_with_gemini(title, description, content, adhd_friendly)
+        if provider == 'auto':
+            return self._stream_fastest(title, description, content, adhd_friendly)
+        if provider == 'local':
+            return iter([self.summarize_locally(title, description, content, adhd_friendly)])
+        return iter(["AI summary not available"])
+    
+    def _stream_fastest(self, title, description, content, adhd_friendly):
+        # Hedged requests race whole responses, so the winner arrives as a single chunk
+        yield self.summarize_fastest(title, description, content, adhd_friendly)
+    
+    def _stream(self, provider, api_key, label, title, description, content, adhd_friendly):
+        """Yield summary chunks as they arrive; the full text is cached once the stream completes"""
+        if not api_key:
+            yield self._fallback(f"{'OpenAI' if provider == 'openai' else 'Google'} API key not configured",
+                                 title, description, content, adhd_friendly)
+            return
+        
+        cached = self.get_cached_summary(title, description, content, provider, adhd_friendly)
+        if cached is not None:
+            yield cached
+            return
+        
+        client = self.openai if provider == 'openai' else self.gemini
+        chunks = []
+        try:
+            for chunk in client.stream(**self._build_request(title, description, content, provider, adhd_friendly)):
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            if chunks:
+                yield f"\n\n{label} summary error: {str(e)}"
+            else:
+                yield self._fallback(f"{label} summary error: {str(e)}", title, description, content, adhd_friendly)
+            return
+        
+        if self.cache and chunks:
+            self.cache.put(self.summary_key(title, description, content, provider, adhd_friendly), ''.join(chunks))
+    
+    def summarize_batch(self, articles, provider="openai", adhd_friendly=False, token_budget=None):
+        """Summarize several articles per request, returning summaries in article order
+        
+        Articles are packed into requests up to token_budget input tokens and the model answers
+        with a JSON object keyed by article id. Cached articles are skipped, and any article the
+        structured output doesn't cover falls back to a regular per-article call.
+        """
+        token_budget = token_budget or int(os.getenv('SUMMARY_BATCH_TOKEN_BUDGET', '3000'))
+        summaries = [None] * len(articles)
+        pending = []
+        
+        for i, article in enumerate(articles):
+            fields = (article['title'], article.get('description') or '', article.get('content') or '')
+            cached = self.get_cached_summary(*fields, provider, adhd_friendly)
+            if cached is not None:
+                summaries[i] = cached
             else:
-                prompt = f"Summarize this AI news article in 2-3 sentences, focusing on key insights and implications:\n\n{text_to_summarize}"
+                pending.append((i, fields))
+        
+        # Greedy packing on the compacted text each article will actually send
+        texts = {i: self._article_text(*fields) for i, fields in pending}
+        batches = []
+        batch, batch_tokens = [], 0
+        for i, fields in pending:
+            tokens = count_tokens(texts[i]) + 10
+            if batch and batch_tokens + tokens > token_budget:
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append((i, fields))
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        
+        for batch in batches:
+            results = self._summarize_batch_request(batch, texts, provider, adhd_friendly) if len(batch) > 1 else {}
+            for i, fields in batch:
+                summary = results.get(str(i))
+                if isinstance(summary, str) and summary.strip():
+                    summaries[i] = summary.strip()
+                    if self.cache:
+                        self.cache.put(self.summary_key(*fields, provider, adhd_friendly), summaries[i])
+                else:
+                    summaries[i] = self.summarize(*fields, provider=provider, adhd_friendly=adhd_friendly)
+        
+        return summaries
+    
+    def _article_text(self, title, description, content):
+        """Compacted article block for a prompt; logs the token saving against the raw text"""
+        text = compact_article(title, description, content, self.prompt_tokens)
+        before = count_tokens(f"Title: {title}\nDescription: {description}\nContent: {content}")
+        print(f"Summary prompt for '{title[:50]}': {before} -> {count_tokens(text)} tokens")
+        return text
+    
+    def _summarize_batch_request(self, batch, texts, provider, adhd_friendly):
+        """One structured-output request for a batch; returns {article id: summary} or {} on failure"""
+        if adhd_friendly:
+            style = ("an ADHD-friendly summary in this format:\n"
+                     "• **Key Insight:** [main point]\n• **Why It Matters:** [implications]\n• **Bottom Line:** [actionable takeaway]")
+        else:
+            style = "a 2-3 sentence summary focusing on key insights and implications"
+        articles_text = "\n\n".join(f"[Article id: {i}]\n{texts[i]}" for i, fields in batch)
+        prompt = (f"For each AI news article below, write {style}.\n"
+                  f"Respond with only a JSON object mapping each article id (as a string) to its summary.\n\n"
+                  f"{articles_text}")
+        max_tokens = (200 if adhd_friendly else 150) * len(batch)
+        
+        try:
+            client = self.openai if provider == 'openai' else self.gemini if provider == 'gemini' else None
+            if client is None:
+                return {}
+            system_prompt = "You are an AI news analyst. Provide concise, informative summaries of AI-related articles." if provider == 'openai' else None
+            text = client.generate(
+                prompt,
+                system_prompt=system_prompt,
+                max_tokens=max_tokens,
+                temperature=0.3 if provider == 'openai' else None,
+                json_output=True
+            )
             
-            response = model.generate_content(prompt)
-            return response.text
+            # Tolerate a fenced code block around the JSON
+            text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text.strip())
+            results = json.loads(text)
+            return results if isinstance(results, dict) else {}
         except Exception as e:
-            return f"Gemini summary error: {str(e)}"
+            print(f"Batch summary failed, falling back to per-article calls: {e}")
+            return {}
 
 if __name__ == "__main__":
     print("Testing all news sources...")
@@ -327,42 +1135,165 @@ class ArticleImageExtractor:
         else:
             return "https://picsum.photos/400/250?random=3&blur=1"
 
+class HeadMetaParser(HTMLParser):
+    """Collects og:image / twitter:image meta tags and notes where the <head> ends"""
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.images = {}
+        self.head_done = False
+    
+    def handle_starttag(self, tag, attrs):
+        if tag == 'body':
+            self.head_done = True
+        elif tag == 'meta':
+            attrs = dict(attrs)
+            name = (attrs.get('property') or attrs.get('name') or '').lower()
+            if name in ('og:image', 'twitter:image') and attrs.get('content') and name not in self.images:
+                self.images[name] = attrs['content']
+    
+    def handle_endtag(self, tag):
+        if tag == 'head':
+            self.head_done = True
+    
+    @property
+    def image(self):
+        return self.images.get('og:image') or self.images.get('twitter:image')
+
 class ArticleImageExtractor:
+    HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    }
+    # The <head> of even heavy news pages fits well inside this; stop reading after it either way
+    HEAD_MAX_BYTES = int(os.getenv('IMAGE_HEAD_MAX_BYTES', str(256 * 1024)))
+    # Shared by the app and the schedulers; opened on first use
+    _cache = None
+    _cache_lock = threading.Lock()
+    
+    @staticmethod
+    def image_cache():
+        """Process-wide disk cache of resolved image urls"""
+        with ArticleImageExtractor._cache_lock:
+            if ArticleImageExtractor._cache is None:
+                ArticleImageExtractor._cache = ImageCache()
+            return ArticleImageExtractor._cache
+    
+    @staticmethod
+    def find_image_url(article_url):
+        """Real image url for an article through the image cache, or None; misses and failures are cached too"""
+        cache = ArticleImageExtractor.image_cache()
+        cached = cache.get(article_url)
+        if cached is not None:
+            return cached or None
+        try:
+            image_url = ArticleImageExtractor.fetch_image_url(article_url)
+        except Exception:
+            image_url = None
+        cache.put(article_url, image_url)
+        return image_url
+    
+    @staticmethod
+    def fetch_image_url(article_url, timeout=5):
+        """og:image / twitter:image of a page, or its first absolute <img>; None when there isn't one
+        
+        The page is streamed and only read up to </head> (or HEAD_MAX_BYTES); the rest of the
+        document is downloaded and fully parsed only when the head has no image meta tags.
+        """
+        with requests.get(article_url, headers=ArticleImageExtractor.HEADERS, timeout=timeout, stream=True) as response:
+            if response.status_code != 200:
+                return None
+            
+            parser = HeadMetaParser()
+            # requests assumes ISO-8859-1 for text/html without a charset; UTF-8 is the better guess
+            encoding = response.encoding if 'charset' in response.headers.get('content-type', '').lower() else 'utf-8'
+            try:
+                decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+            except LookupError:
+                decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            received = []
+            size = 0
+            for chunk in response.iter_content(chunk_size=16384):
+                received.append(chunk)
+                size += len(chunk)
+                parser.feed(decoder.decode(chunk))
+                if 'og:image' in parser.images or parser.head_done or size >= ArticleImageExtractor.HEAD_MAX_BYTES:
+                    break
+            
+            if parser.image:
+                return urljoin(article_url, parser.image)
+            
+            # Slow path: no usable meta tags up front, look at the whole document like before
+            received.extend(response.iter_content(chunk_size=65536))
+        
+        soup = BeautifulSoup(b''.join(received), 'html.parser')
+        for meta in (soup.find('meta', property='og:image'), soup.find('meta', attrs={'name': 'twitter:image'})):
+            if meta and meta.get('content'):
+                return urljoin(article_url, meta.get('content'))
+        img_tag = soup.find('img')
+        if img_tag and img_tag.get('src', '').startswith('http'):
+            return img_tag.get('src')
+        return None
+    
     @staticmethod
     def get_article_image(article_url, title=""):
         """Get image for article using multiple strategies"""
         
-        # Strategy 1: Try to extract from article URL
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(article_url, headers=headers, timeout=5)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Look for Open Graph image
-                og_image = soup.find('meta', property='og:image')
-                if og_image and og_image.get('content'):
-                    return og_image.get('content')
-                
-                # Look for Twitter Card image
-                twitter_image = soup.find('meta', attrs={'name': 'twitter:image'})
-                if twitter_image and twitter_image.get('content'):
-                    return twitter_image.get('content')
-                
-                # Look for first img tag in article
-                img_tag = soup.find('img')
-                if img_tag and img_tag.get('src'):
-                    img_src = img_tag.get('src')
-                    if img_src.startswith('http'):
-                        return img_src
-        except:
-            pass
+        # Strategy 1: Try to extract from article URL (cached on disk, failures included)
+        image_url = ArticleImageExtractor.find_image_url(article_url)
+        if image_url:
+            return image_url
         
         # Strategy 2: Generate placeholder based on article content
         return ArticleImageExtractor.get_placeholder_image(title, article_url)
     
+    @staticmethod
+    def resolve_images(articles, max_workers=None, deadline=None, placeholders=True):
+        """Fill in image_url for every article concurrently, giving up on the stragglers at the deadline
+        
+        Articles that already carry an image_url (e.g. NewsAPI's urlToImage) are left alone and
+        cached images are used without a download. Articles without a real image (no image, failed,
+        or still loading at the deadline) get the deterministic placeholder, or are left without
+        image_url when placeholders is False.
+        """
+        def fallback(article):
+            if placeholders:
+                article['image_url'] = ArticleImageExtractor.get_placeholder_image(article['title'], article.get('url', ''))
+        
+        cache = ArticleImageExtractor.image_cache()
+        pending = []
+        for article in articles:
+            if article.get('image_url'):
+                continue
+            cached = cache.get(article.get('url', ''))
+            if cached:
+                article['image_url'] = cached
+            elif cached == '':
+                fallback(article)
+            else:
+                pending.append(article)
+        if not pending:
+            return articles
+        max_workers = max_workers or int(os.getenv('IMAGE_RESOLVE_WORKERS', '16'))
+        deadline = deadline or float(os.getenv('IMAGE_RESOLVE_DEADLINE', '6'))
+        
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(pending)), thread_name_prefix='image-resolve')
+        futures = {
+            executor.submit(ArticleImageExtractor.find_image_url, article.get('url', '')): article
+            for article in pending
+        }
+        done, not_done = wait(futures, timeout=deadline)
+        # Don't block on pages still downloading; their threads finish in the background and
+        # still write their result to the image cache for the next refresh
+        executor.shutdown(wait=False, cancel_futures=True)
+        
+        for future, article in futures.items():
+            if future in done and future.exception() is None and future.result():
+                article['image_url'] = future.result()
+            else:
+                fallback(article)
+        print(f"Resolved images for {len(done)} of {len(pending)} articles ({len(not_done)} hit the {deadline:g}s deadline)")
+        return articles
+    
     @staticmethod
     def get_placeholder_image(title="", url=""):
         """Generate consistent placeholder images based on content"""
@@ -0,0 +1,113 @@
+"""
+Prompt compaction for summary requests
+Article text is cleaned (HTML, entities, feed boilerplate), sentences that repeat the title or
+description are dropped, and the content is cut at a sentence boundary to fit a token budget.
+Tokens are counted with tiktoken when it is installed, otherwise estimated at ~4 characters per token.
+"""
+
+import re
+import html
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+TAG = re.compile(r'<[^>]+>')
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"“\'])')
+WORD = re.compile(r'\w+')
+
+# Feed and NewsAPI furniture that carries no content
+BOILERPLATE = [
+    re.compile(r'\[\+\d+ chars\]'),
+    re.compile(r'\[(?:…|\.\.\.)\]'),
+    re.compile(r'The post .{1,300}? appeared first on .{1,100}?\.', re.S),
+    re.compile(r'\b(?:Continue reading|Read more|Read the full story|Click here to read more)\b.*?(?:\.|$)', re.I),
+    re.compile(r'\bComments\s*$', re.I),
+]
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding('cl100k_base')
+    except Exception:
+        return None
+
+
+def count_tokens(text):
+    """Token count under cl100k_base, or a ~4 characters per token estimate without tiktoken"""
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def clean_text(text):
+    """Plain text with tags, entities, boilerplate and runs of whitespace removed"""
+    text = html.unescape(TAG.sub(' ', text or ''))
+    for pattern in BOILERPLATE:
+        text = pattern.sub(' ', text)
+    return ' '.join(text.split())
+
+
+def word_set(text):
+    return set(WORD.findall(text.lower()))
+
+
+def is_repeat(sentence, seen_words):
+    """True when nearly every word of the sentence already appears in earlier fields"""
+    words = word_set(sentence)
+    return bool(words) and len(words & seen_words) >= 0.8 * len(words)
+
+
+def _truncate(sentences, budget):
+    """Leading sentences that fit the budget; a too-long first sentence is cut by words"""
+    kept = []
+    used = 0
+    for sentence in sentences:
+        tokens = count_tokens(sentence) + 1
+        if used + tokens > budget:
+            if not kept:
+                words = sentence.split()
+                while words and count_tokens(' '.join(words)) > budget:
+                    words = words[:int(len(words) * 0.9)]
+                # A single unbroken run (URL, base64) is cut by characters instead
+                kept.append((' '.join(words) if words else sentence[:budget * 4]) + '…')
+            break
+        kept.append(sentence)
+        used += tokens
+    return kept
+
+
+def compact_article(title, description='', content='', max_tokens=300):
+    """Compact 'Title/Description/Content' block for a prompt, within max_tokens where possible"""
+    title = clean_text(title)
+    description = clean_text(description)
+    seen_words = word_set(title)
+
+    description_sentences = [s for s in SENTENCE_SPLIT.split(description) if s and not is_repeat(s, seen_words)]
+    description = ' '.join(description_sentences)
+    seen_words |= word_set(description)
+
+    content_sentences = []
+    seen_sentences = set()
+    for sentence in SENTENCE_SPLIT.split(clean_text(content)):
+        key = ' '.join(WORD.findall(sentence.lower()))
+        if key and key not in seen_sentences and not is_repeat(sentence, seen_words):
+            content_sentences.append(sentence)
+            seen_sentences.add(key)
+
+    header = f"Title: {title}\nDescription: {description}"
+    # The title is always kept; description and content share what is left of the budget
+    budget = max(max_tokens - count_tokens(header) - 3, 0)
+    if count_tokens(description) > max_tokens // 2:
+        description = ' '.join(_truncate(description_sentences, max_tokens // 2))
+        header = f"Title: {title}\nDescription: {description}"
+        budget = max(max_tokens - count_tokens(header) - 3, 0)
+
+    content = ' '.join(_truncate(content_sentences, budget))
+    return f"{header}\nContent: {content}" if content else header
@@ -9,8 +9,9 @@ import schedule
 import time
 import threading
 from datetime import datetime
-from news_fetcher import NewsAPI, HackerNewsFetcher, ArticleDeduplicator
+from news_fetcher import NewsAPI, HackerNewsFetcher, ArticleDeduplicator, ArticleImageExtractor
 from slack_notifier import SlackNotifier
+from news_cache import SeenArticleStore
 import os
 
 class StreamlitScheduler:
@@ -41,6 +42,8 @@ class StreamlitScheduler:
         self.hn_fetcher = HackerNewsFetcher()
         self.deduplicator = ArticleDeduplicator()
         self.slack = SlackNotifier()
+        # Stories already sent in an earlier digest are dropped before dedup
+        self.seen_store = SeenArticleStore()
         
         self.is_running = False
         self.scheduler_thread = None
@@ -56,7 +59,7 @@ class StreamlitScheduler:
             # Fetch Hacker News
             try:
                 st.write("📰 Fetching from Hacker News...")
-                hn_articles = self.hn_fetcher.get_ai_stories(limit=10)
+                hn_articles = self.hn_fetcher.crawl_ai_stories(limit=10)
                 if hn_articles:
                     all_articles.extend(hn_articles)
                     stats['hacker_news_count'] = len(hn_articles)
@@ -67,19 +70,11 @@ class StreamlitScheduler:
             # Fetch NewsAPI
             try:
                 st.write("🌐 Fetching from NewsAPI...")
-                news_response = self.news_api.get_ai_news(query="artificial intelligence", page_size=15)
-                if news_response and news_response.get('status') == 'ok':
-                    news_articles = []
-                    for article in news_response['articles']:
-                        news_articles.append({
-                            'title': article['title'],
-                            'description': article['description'],
-                            'url': article['url'],
-                            'published': article['publishedAt'],
-                            'source': article['source']['name'],
-                            'content': article.get('content', ''),
-                            'image_url': article.get('urlToImage')
-                        })
+                # Page lazily until 15 unique articles are collected
+                news_articles = ArticleDeduplicator.take_unique(
+                    self.news_api.iter_ai_news(query="artificial intelligence", page_size=15), 15
+                )
+                if news_articles:
                     all_articles.extend(news_articles)
                     stats['news_api_count'] = len(news_articles)
                     st.write(f"   ✅ Got {len(news_articles)} NewsAPI articles")
@@ -89,12 +84,16 @@ class StreamlitScheduler:
             # Deduplicate
             if all_articles:
                 st.write("🔍 Deduplicating articles...")
-                deduplicated = self.deduplicator.remove_duplicates(all_articles, 80)
+                deduplicated = self.deduplicator.remove_duplicates(all_articles, 80, seen_store=self.seen_store)
                 st.write(f"   📊 {len(all_articles)} -> {len(deduplicated)} articles")
                 
+                # Real images only (cached on disk across runs); Slack cards without one just skip the image
+                ArticleImageExtractor.resolve_images(deduplicated[:8], placeholders=False)
+                
                 # Send to Slack
                 st.write(f"📤 Sending {len(deduplicated[:8])} articles to Slack...")
                 if self.slack.send_daily_news(deduplicated[:8], stats):
+                    self.seen_store.mark_delivered(deduplicated[:8])
                     st.success("✅ Daily news sent to Slack successfully!")
                     return True
                 else:
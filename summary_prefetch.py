@@ -0,0 +1,73 @@
+"""
+Background summary prefetching
+After a refresh the top articles are summarized on a small worker pool, throttled to a
+requests-per-minute limit, so cards find their summary in the cache instead of waiting on a click
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from llm_providers import RateLimiter
+
+
+class SummaryPrefetcher:
+    """Summarizes articles in the background through an AISummaryGenerator, filling its summary cache"""
+
+    def __init__(self, summarizer, max_workers=None, requests_per_minute=None):
+        self.summarizer = summarizer
+        max_workers = max_workers or int(os.getenv('SUMMARY_PREFETCH_WORKERS', '3'))
+        requests_per_minute = requests_per_minute or float(os.getenv('SUMMARY_PREFETCH_RPM', '20'))
+        self.top_k = int(os.getenv('SUMMARY_PREFETCH_TOP_K', '10'))
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='summary-prefetch')
+        self.limiter = RateLimiter(requests_per_minute)
+        self._pending = {}
+        # Keys whose summary failed (nothing reached the cache): key -> (failures, retry not before)
+        self._failed = {}
+        self.retry_backoff = float(os.getenv('SUMMARY_PREFETCH_RETRY_BACKOFF', '300'))
+        self.max_retry_backoff = 3600.0
+        self._lock = threading.Lock()
+
+    def _summarize(self, key, fields, provider, adhd_friendly):
+        self.limiter.acquire()
+        summary = self.summarizer.summarize(*fields, provider=provider, adhd_friendly=adhd_friendly)
+        # Errors and local fallbacks are never cached; back off instead of requeueing on every render
+        with self._lock:
+            if self.summarizer.get_cached_summary(*fields, provider, adhd_friendly) is None:
+                failures = self._failed.get(key, (0, 0))[0] + 1
+                delay = min(self.max_retry_backoff, self.retry_backoff * 2 ** (failures - 1))
+                self._failed[key] = (failures, time.monotonic() + delay)
+            else:
+                self._failed.pop(key, None)
+        return summary
+
+    def prefetch(self, articles, provider, adhd_friendly=False, top_k=None):
+        """Queue summaries for the first top_k articles that aren't cached, queued or backing off
+
+        Returns the cache keys that were queued by this call.
+        """
+        queued = []
+        now = time.monotonic()
+        with self._lock:
+            # Forget finished jobs; their results are in the summary cache
+            self._pending = {key: future for key, future in self._pending.items() if not future.done()}
+            for article in articles[:top_k or self.top_k]:
+                fields = (article['title'], article.get('description', ''), article.get('content', ''))
+                key = self.summarizer.summary_key(*fields, provider, adhd_friendly)
+                if key in self._pending or self._failed.get(key, (0, 0))[1] > now:
+                    continue
+                if self.summarizer.get_cached_summary(*fields, provider, adhd_friendly) is not None:
+                    continue
+                self._pending[key] = self.executor.submit(self._summarize, key, fields, provider, adhd_friendly)
+                queued.append(key)
+        return queued
+
+    def is_pending(self, summary_key):
+        """True while a summary for this cache key is queued or running"""
+        with self._lock:
+            future = self._pending.get(summary_key)
+        return future is not None and not future.done()
+
+    def pending_count(self):
+        with self._lock:
+            return sum(1 for future in self._pending.values() if not future.done())